@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-import os, sys, subprocess, textwrap, re
+import os, sys, subprocess, textwrap, re, time
 from pathlib import Path
 
 import streamlit as st
@@ -9,10 +9,6 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import plotly.express as px
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
-from sklearn.decomposition import PCA
 
 # graceful fallback if fancy menu missing
 try:
@@ -27,7 +23,12 @@ try:
 except ModuleNotFoundError:
     genai = None
 
-DATA_CSV = Path("jumia_products_clean.csv")
+# share the API's catalog, aggregates & search code
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+from catalog import catalog, CatalogSnapshot, output_frame
+from views import facets, filter_mask, top_deals, product_space, sample_positions
+from qa import CatalogQA
+from images import ImageUnavailable, image_cache
 
 # ---------------------------------------------------------------------------
 # Theme & page config
@@ -56,25 +57,59 @@ def get_col(df: pd.DataFrame, contains: tuple[str, ...]):
     return None
 
 
-def ensure_numeric(df: pd.DataFrame, col: str | None, new: str) -> str | None:
-    if col is None or col not in df:
-        return None
-    if pd.api.types.is_numeric_dtype(df[col]):
-        return col
-    cleaned = (
-        df[col].astype(str)
-        .str.replace(r"[^0-9.,]", "", regex=True)
-        .str.replace(",", "", regex=False)
-        .str.replace("\u202f", "", regex=False)
-    )
-    df[new] = pd.to_numeric(cleaned, errors="coerce")
-    return new
-
-@st.cache_data(show_spinner="Loading data …")
-def load_data() -> pd.DataFrame:
-    return pd.read_csv(DATA_CSV) if DATA_CSV.exists() else pd.DataFrame()
-
-_df = load_data()
+def load_data() -> CatalogSnapshot:
+    # same versioned in-memory catalog as the API; re-reads the CSV only when it changes
+    return catalog.get()
+
+_snap = load_data()
+_df, _ver = _snap.df, _snap.version
+
+# everything below is memoized per (data version, filter set); _snap/_df_f are not hashed
+@st.cache_resource(show_spinner=False, max_entries=16)
+def filtered(_snap: CatalogSnapshot, version: str | None, filters: tuple) -> tuple[np.ndarray, pd.DataFrame]:
+    sel_c, sel_b, sel_t, sel_p = filters
+    mask = filter_mask(_snap, sel_c, sel_b, sel_t, sel_p)
+    return mask, _snap.df[mask]  # shared read-only frame, never mutate
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def chart_data(_df_f: pd.DataFrame, version: str | None, filters: tuple) -> dict:
+    prices = _df_f["price_numeric"].dropna()
+    return {
+        "rows": len(_df_f), "avg_price": prices.mean(), "avg_disc": _df_f["discount_percentage"].mean(), "brands": _df_f["brand"].nunique(),
+        "hist": np.histogram(prices, bins=30),
+        "by_category": _df_f.groupby("category", observed=True)["price_numeric"].mean().reset_index().sort_values("price_numeric"),
+        "by_type": _df_f["type_product"].value_counts().loc[lambda s: s > 0].rename_axis("type").reset_index(name="count"),
+    }
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def pca_projection(_mask: np.ndarray, version: str | None, filters: tuple, max_points: int = 5000) -> pd.DataFrame | None:
+    # coordinates come from the cleaning pipeline; only the plotted sample is built here
+    coords = product_space(_snap)
+    keep = _mask & ~np.isnan(coords[:,0]) & _df["type_product"].notna().to_numpy()
+    if keep.sum()<2: return None
+    pos = sample_positions(_snap, keep, max_points)
+    res=pd.DataFrame(coords[pos],columns=["PCA1","PCA2"]); res["type_product"]=_df["type_product"].to_numpy()[pos]
+    return res
+
+THUMB_MISS_TTL = 300  # seconds before an image that failed is tried again
+
+@st.cache_resource(show_spinner=False)
+def thumbnail_misses() -> dict[str, float]:
+    return {}  # url -> time of the failure, shared by every session and rerun
+
+def thumbnail(url: str):
+    # resized copy from the API's image cache (prefetched after each scrape); retailer URL if that fails
+    misses = thumbnail_misses()
+    if time.monotonic() - misses.get(url, float("-inf")) < THUMB_MISS_TTL: return url
+    try: return image_cache.thumbnail(url, 320)[0]
+    except (ValueError, ImageUnavailable):
+        misses[url] = time.monotonic()
+        return url
+
+@st.cache_resource(show_spinner=False)
+def gemini_qa(api_key: str) -> CatalogQA:
+    genai.configure(api_key=api_key)
+    return CatalogQA(genai.GenerativeModel("gemini-1.5-flash"))
 
 # ---------------------------------------------------------------------------
 # Sidebar: scrape button + filters + nav
@@ -85,7 +120,7 @@ with st.sidebar:
         with st.spinner("Pipeline running…"):
             subprocess.run([sys.executable,"scraper_jumia_electronics.py"],check=True,env=env)
             subprocess.run([sys.executable,"clean_jumia_data.py"],check=True,env=env)
-        load_data.clear(); st.rerun()
+        catalog.reload(); st.rerun()
 
 with st.sidebar:
     st.markdown("## 🛒 Jumia Explorer")
@@ -93,29 +128,18 @@ with st.sidebar:
 
 # build filters (shared across tabs)
 if not _df.empty:
-    price_col = ensure_numeric(_df, get_col(_df,("price",)), "price_numeric")
-    disc_col = ensure_numeric(_df, get_col(_df,("discount",)), "discount_numeric")
-    cat_col  = get_col(_df,("category",))
+    price_col, disc_col, cat_col = "price_numeric", "discount_percentage", "category"
+    fac = facets(_snap)
     with st.sidebar.expander("Filters", expanded=True):
-        cats   = sorted(_df[cat_col].dropna().unique()) if cat_col else []
-        sel_c  = st.multiselect("Category", cats, default=cats)
-        brands = sorted(_df["brand"].dropna().unique()) if "brand" in _df else []
-        sel_b  = st.multiselect("Brand", brands, default=brands)
-        types  = sorted(_df["type_product"].dropna().unique()) if "type_product" in _df else []
-        sel_t  = st.multiselect("Type", types, default=types)
-        if price_col:
-            pmin, pmax = int(_df[price_col].min()), int(_df[price_col].max())
-            sel_p  = st.slider("Price (Dhs)", pmin, pmax, (pmin, pmax), step=100)
-        else:
-            sel_p=None
-    mask = pd.Series(True, index=_df.index)
-    if sel_c and cat_col: mask &= _df[cat_col].isin(sel_c)
-    if sel_b: mask &= _df["brand"].isin(sel_b)
-    if sel_t: mask &= _df["type_product"].isin(sel_t)
-    if sel_p and price_col: mask &= _df[price_col].between(*sel_p)
-    df_f = _df[mask]
+        sel_c  = st.multiselect("Category", fac.categories, default=fac.categories)
+        sel_b  = st.multiselect("Brand", fac.brands, default=fac.brands)
+        sel_t  = st.multiselect("Type", fac.types, default=fac.types)
+        pmin, pmax = _snap.derived("price_bounds", lambda df: (int(df[price_col].min()), int(df[price_col].max())))
+        sel_p  = st.slider("Price (Dhs)", pmin, pmax, (pmin, pmax), step=100)
+    filters = (tuple(sel_c), tuple(sel_b), tuple(sel_t), tuple(sel_p))
+    mask, df_f = filtered(_snap, _ver, filters)
 else:
-    df_f = _df.copy()
+    df_f = _df
     price_col = disc_col = cat_col = None
 
 # ---------------------------------------------------------------------------
@@ -124,19 +148,14 @@ else:
 if nav == "Home":
     st.title("📊 Catalogue & Smart Deals")
     if df_f.empty: st.info("No data – scrape first."); st.stop()
-    trusted = {"samsung","xiaomi","apple","lg","sony","dell","hp","lenovo","huawei","asus"}
-    disc_series = df_f[disc_col].fillna(0) if disc_col in df_f else 0
-    df_f = df_f.copy()
-    if price_col is None: st.error("Price column missing"); st.stop()
-    df_f["deal_score"] = disc_series*0.4 + (1/df_f[price_col].replace(0,np.nan)).fillna(0)*10000*0.3 + df_f["brand"].str.lower().apply(lambda b:1 if b in trusted else 0)*0.3
-    top5 = df_f.sort_values("deal_score",ascending=False).head(5)
+    top5 = output_frame(_df.iloc[top_deals(_snap, 5, mask)])  # deal scores precomputed per data version
 
     img_col = get_col(df_f,("image","img")); url_col = get_col(df_f,("link","url"))
     st.subheader("🔥 Top 5 genuine deals")
     for _,row in top5.iterrows():
         with st.container():
             l,r=st.columns([1,4],gap="medium")
-            if img_col and pd.notna(row[img_col]): l.image(row[img_col],use_container_width=True)
+            if img_col and pd.notna(row[img_col]): l.image(thumbnail(row[img_col]),use_container_width=True)
             else: l.write("*(no image)*")
             pill=f"<span class='pill'>{row[cat_col]}</span>" if cat_col and pd.notna(row[cat_col]) else ""
             r.markdown(f"### {row.get('title','No title')} {pill}",unsafe_allow_html=True)
@@ -152,10 +171,11 @@ elif nav == "Visualisation":
 
     # KPI summary
     c1,c2,c3,c4 = st.columns(4)
-    c1.metric("Rows", len(df_f))
-    if price_col: c2.metric("Avg price", f"{df_f[price_col].mean():,.0f} Dhs")
-    if disc_col: c3.metric("Avg discount", f"{df_f[disc_col].mean():.1f}%")
-    c4.metric("Brands", df_f['brand'].nunique())
+    cd = chart_data(df_f, _ver, filters)
+    c1.metric("Rows", cd["rows"])
+    c2.metric("Avg price", f"{cd['avg_price']:,.0f} Dhs")
+    c3.metric("Avg discount", f"{cd['avg_disc']:.1f}%")
+    c4.metric("Brands", cd["brands"])
 
     st.divider()
 
@@ -165,7 +185,7 @@ elif nav == "Visualisation":
     # Price distribution histogram
     with colA:
         st.markdown("#### Price distribution")
-        fig,ax = plt.subplots(); ax.hist(df_f[price_col].dropna(), bins=30); ax.set_xlabel("Price (Dhs)"); ax.set_ylabel("Count")
+        fig,ax = plt.subplots(); ax.stairs(*cd["hist"], fill=True); ax.set_xlabel("Price (Dhs)"); ax.set_ylabel("Count")
         st.pyplot(fig)
 
     # Discounts vs price scatter
@@ -180,14 +200,14 @@ elif nav == "Visualisation":
     # Avg price by category
     if cat_col:
         st.markdown("#### Average price by category")
-        pvt = df_f.groupby(cat_col)[price_col].mean().reset_index().sort_values(price_col)
+        pvt = cd["by_category"]
         fig = px.bar(pvt, x=price_col, y=cat_col, orientation='h', labels={price_col:"Avg price (Dhs)", cat_col:"Category"})
         st.plotly_chart(fig, use_container_width=True)
 
     # Count by type
-    if 'type_product' in df_f:
+    if len(cd["by_type"]):
         st.markdown("#### Product count by type")
-        cnt = df_f['type_product'].value_counts().reset_index(); cnt.columns=['type','count']
+        cnt = cd["by_type"]
         fig = px.bar(cnt, x='type', y='count', labels={'type':'Type','count':'Count'})
         st.plotly_chart(fig, use_container_width=True)
 
@@ -198,18 +218,11 @@ elif nav == "PCA":
     st.title(" PCA Analysis of product space")
     if df_f.empty: st.warning("No data after filters.")
     else:
-        price_col = ensure_numeric(df_f, price_col, price_col)  # ensure exists
-        disc_col  = ensure_numeric(df_f, disc_col, disc_col)
-        if not price_col or not disc_col: st.error("Need price & discount columns.")
+        res = pca_projection(mask, _ver, filters)
+        if res is None: st.warning("Not enough rows for PCA.")
         else:
-            base = df_f.dropna(subset=["brand","type_product",price_col,disc_col])
-            if len(base)<2: st.warning("Not enough rows for PCA.")
-            else:
-                pipe=Pipeline([("pre",ColumnTransformer([("num",StandardScaler(),[price_col,disc_col]),("cat",OneHotEncoder(handle_unknown='ignore',sparse_output=False),["brand","type_product"])])),("pca",PCA(n_components=2))])
-                coords=pipe.fit_transform(base[[price_col,disc_col,"brand","type_product"]])
-                res=pd.DataFrame(coords,columns=["PCA1","PCA2"]); res["type_product"]=base["type_product"].values
-                fig=px.scatter(res,x="PCA1",y="PCA2",color="type_product",width=900,height=550)
-                st.plotly_chart(fig,use_container_width=True)
+            fig=px.scatter(res,x="PCA1",y="PCA2",color="type_product",width=900,height=550)
+            st.plotly_chart(fig,use_container_width=True)
                 
 # ----------------------------------------------------------------------------
 # ASK GEMINI TAB -----------------------------------------------------------
@@ -221,17 +234,16 @@ elif nav == "Ask Gemini":
     else:
         api_key = st.sidebar.text_input("Google API Key", type="password")
         if api_key:
-            try: genai.configure(api_key=api_key); model = genai.GenerativeModel("gemini-1.5-flash"); # st.success("Gemini ready ✔️")
-            except Exception as e: st.error(f"API error: {e}"); model=None
-        else: model=None; st.info("Enter your Google API key to enable Gemini.")
+            try: qa = gemini_qa(api_key) # st.success("Gemini ready ✔️")
+            except Exception as e: st.error(f"API error: {e}"); qa=None
+        else: qa=None; st.info("Enter your Google API key to enable Gemini.")
         if _df.empty: st.warning("Scrape data first.")
-        elif model:
+        elif qa:
             q = st.text_area("Your question about Jumia products:");
             if st.button("Ask Gemini") and q.strip():
                 with st.spinner("Gemini is thinking …"):
-                    ctx = _df.head(200).to_markdown(index=False)
-                    prompt = textwrap.dedent(f"You are an e‑commerce expert. Use ONLY this table:\n{ctx}\nQuestion: {q}\nIf data is insufficient say so.")
-                    try: ans = model.generate_content(prompt).text; st.markdown("### Answer from Gemini"); st.markdown(ans)
+                    # only the rows relevant to q go into the prompt; answers cached per data version
+                    try: ans = qa.ask(q); st.markdown("### Answer from Gemini"); st.markdown(ans.text); st.caption(f"{ans.rows} products in context · {ans.prompt_chars:,} prompt chars{' · cached' if ans.cached else ''}")
                     except Exception as e: st.error(f"Gemini error: {e}")
 
 # ---------------------------------------------------------------------------
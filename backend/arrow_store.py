@@ -0,0 +1,120 @@
+"""
+Memory-mapped Arrow snapshots of the catalog, shared by all API workers
+
+The first worker to see a new dataset version converts it to an Arrow IPC
+file under a cross-process lock and publishes it with an atomic rename; every
+worker then maps that file read-only. Column buffers therefore live once in
+the OS page cache however many gunicorn workers run.
+"""
+import contextlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import fcntl
+except ImportError:  # Windows dev server runs a single process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# What a failed snapshot read can raise; callers fall back to loading privately
+SNAPSHOT_ERRORS = (OSError, pa.ArrowInvalid) if pa is not None else (OSError,)
+
+
+class ArrowStore:
+    """Directory of ``<version>.arrow`` files plus a ``CURRENT`` pointer"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.pointer = root / "CURRENT"
+
+    @property
+    def available(self) -> bool:
+        return pa is not None
+
+    def current(self) -> Optional[str]:
+        """Version most recently published by any worker"""
+        try:
+            return self.pointer.read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def get(self, version: str, build: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Map the snapshot for ``version``, building it once if no worker has yet"""
+        path = self.root / f"{version}.arrow"
+        if not path.exists():
+            with self._locked():
+                if not path.exists():
+                    self._write(path, build())
+                    self._publish(version)
+        try:
+            return self._map(path)
+        except pa.ArrowInvalid as e:
+            # truncated or corrupt file (e.g. disk full while another worker wrote it)
+            logger.warning("Rebuilding corrupt catalog snapshot %s: %s", path.name, e)
+            with self._locked():
+                try:
+                    return self._map(path)  # already rebuilt by another worker
+                except pa.ArrowInvalid:
+                    self._write(path, build())
+                    self._publish(version)
+        return self._map(path)
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / "lock", "w") as fh:
+            if fcntl:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _write(self, path: Path, df: pd.DataFrame) -> None:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        for i, name in enumerate(table.column_names):
+            if df[name].dtype.kind == "f":
+                # NaN as a value rather than a null keeps the column zero-copy on read
+                table = table.set_column(i, name, pa.array(df[name].to_numpy()))
+        table = table.replace_schema_metadata({"url_prefix": json.dumps(df.attrs.get("url_prefix", {}))})
+
+        tmp = path.with_suffix(".tmp")
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+
+    def _publish(self, version: str) -> None:
+        # keep the previous snapshot too: workers that have not switched yet still read it
+        keep = {version, self.current()}
+        tmp = self.pointer.with_suffix(".tmp")
+        tmp.write_text(version)
+        os.replace(tmp, self.pointer)
+        # unlinking is safe on POSIX even while another worker still maps the file
+        for old in self.root.glob("*.arrow"):
+            if old.stem not in keep:
+                with contextlib.suppress(OSError):
+                    old.unlink()
+        logger.info("Published catalog snapshot %s", version)
+
+    def _map(self, path: Path) -> pd.DataFrame:
+        table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        strings = pd.StringDtype("pyarrow")
+        df = table.to_pandas(
+            split_blocks=True,
+            types_mapper={pa.string(): strings, pa.large_string(): strings}.get,
+        )
+        metadata = table.schema.metadata or {}
+        df.attrs["url_prefix"] = json.loads(metadata.get(b"url_prefix", b"{}"))
+        return df
@@ -0,0 +1,192 @@
+"""
+Versioned in-memory product catalog
+
+Run ``python backend/catalog.py [csv]`` for a per-column memory report of the
+compact layout against a plain ``pd.read_csv``.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from arrow_store import SNAPSHOT_ERRORS, ArrowStore
+from metrics import CACHE_REQUESTS, DATASET_LOAD_SECONDS, DATASET_ROWS, DATASET_SWAP_SECONDS
+
+try:
+    import pyarrow  # noqa: F401  (backs compact string columns)
+    STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    STRING_DTYPE = object
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Data file path; CATALOG_CSV points the API at another dataset (benchmarks)
+DATA_CSV = Path(os.environ.get("CATALOG_CSV") or PROJECT_ROOT / "jumia_products_clean.csv")
+
+# Memory-mapped snapshots shared by the API worker processes, one directory per dataset
+SNAPSHOT_DIR = PROJECT_ROOT / ".cache" / "catalog" / DATA_CSV.stem
+# Part of every snapshot key: bump when load_products or ArrowStore change the
+# columns or dtypes a snapshot holds, so old snapshots are not served after a deploy
+SNAPSHOT_LAYOUT = 2
+
+# Compact in-memory layout of the product catalog
+CATEGORY_COLUMNS = ["brand", "category", "type_product"]
+FLOAT32_COLUMNS = ["price_numeric", "old_price_numeric", "discount_percentage", "pca_x", "pca_y"]
+URL_COLUMNS = ["product_link", "image_url"]
+STRING_COLUMNS = ["title", *URL_COLUMNS]
+LOADED_COLUMNS = set(CATEGORY_COLUMNS + FLOAT32_COLUMNS + STRING_COLUMNS)  # page_url is never served
+
+# Decimals kept when float32 values leave the catalog
+OUTPUT_DECIMALS = {"price_numeric": 2, "old_price_numeric": 2, "discount_percentage": 1}
+
+
+def load_products(path: Path) -> pd.DataFrame:
+    """Read the cleaned CSV into the compact layout.
+
+    Low-cardinality text becomes categorical codes, numbers float32, and the
+    prefix shared by every URL in a column (``https://ma.jumia.is/unsafe/...``)
+    is stored once in ``df.attrs["url_prefix"]``; :func:`output_frame` puts it back.
+    """
+    dtype = {
+        **{c: "category" for c in CATEGORY_COLUMNS},
+        **{c: np.float32 for c in FLOAT32_COLUMNS},
+        **{c: STRING_DTYPE for c in STRING_COLUMNS},
+    }
+    df = pd.read_csv(path, usecols=lambda c: c in LOADED_COLUMNS, dtype=dtype)
+
+    prefixes = {}
+    for col in URL_COLUMNS:
+        if col in df:
+            prefix = os.path.commonprefix(df[col].dropna().unique().tolist())
+            if prefix:
+                df[col] = df[col].str.slice(len(prefix))
+                prefixes[col] = prefix
+    df.attrs["url_prefix"] = prefixes
+    return df
+
+
+def output_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Undo the compact layout for rows about to be served: full URLs, rounded float64"""
+    out = df.copy(deep=False)
+    for col, prefix in df.attrs.get("url_prefix", {}).items():
+        if col in out:
+            out[col] = prefix + out[col].astype(object)
+    for col, decimals in OUTPUT_DECIMALS.items():
+        if col in out and out[col].dtype == np.float32:
+            out[col] = out[col].astype(np.float64).round(decimals)
+    return out
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """An immutable view of one published dataset version"""
+    version: Optional[str]
+    df: pd.DataFrame
+    loaded_at: datetime
+    _derived: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+
+    def derived(self, key: str, build: Callable[[pd.DataFrame], Any]) -> Any:
+        """Compute a value from ``df`` once and reuse it for this version"""
+        if key not in self._derived:
+            CACHE_REQUESTS.inc(cache=key, result="miss")
+            self._derived[key] = build(self.df)
+        else:
+            CACHE_REQUESTS.inc(cache=key, result="hit")
+        return self._derived[key]
+
+
+class Catalog:
+    """Keeps the cleaned CSV in memory and reloads it only when the file changes.
+
+    The version is derived from the file's mtime and size, so a ``stat`` call is
+    enough to detect that the cleaner has published a new dataset. With a
+    ``store`` the loaded frame is shared with other processes as a memory-mapped
+    Arrow snapshot instead of being parsed by each of them.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        load: Callable[[Path], pd.DataFrame] = pd.read_csv,
+        store: Optional[ArrowStore] = None,
+    ):
+        self.path = path
+        self.load = load
+        self.store = store
+        self._lock = threading.Lock()
+        self._snapshot = CatalogSnapshot(version=None, df=pd.DataFrame(), loaded_at=datetime.now())
+
+    def _fingerprint(self) -> Optional[str]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+    @property
+    def loaded_version(self) -> Optional[str]:
+        """Version currently in memory, without looking at the file"""
+        return self._snapshot.version
+
+    def get(self) -> CatalogSnapshot:
+        """Return the current snapshot, reloading if a new version was published"""
+        if self._fingerprint() != self._snapshot.version:
+            return self.reload()
+        return self._snapshot
+
+    def reload(self) -> CatalogSnapshot:
+        """Force a reload from disk"""
+        start = time.perf_counter()
+        with self._lock:
+            version = self._fingerprint()
+            if version == self._snapshot.version:
+                return self._snapshot
+            df = self._read(version) if version else pd.DataFrame()
+            self._snapshot = CatalogSnapshot(version=version, df=df, loaded_at=datetime.now())
+        DATASET_SWAP_SECONDS.observe(time.perf_counter() - start, dataset=self.path.name)
+        DATASET_ROWS.set(len(df), dataset=self.path.name)
+        return self._snapshot
+
+    def _read(self, version: str) -> pd.DataFrame:
+        if self.store is not None and self.store.available:
+            try:
+                with DATASET_LOAD_SECONDS.time(dataset=self.path.name, source="shared"):
+                    return self.store.get(f"{version}-l{SNAPSHOT_LAYOUT}", lambda: self.load(self.path))
+            except SNAPSHOT_ERRORS as e:
+                logger.warning(f"Shared snapshot unavailable, loading privately: {e}")
+        with DATASET_LOAD_SECONDS.time(dataset=self.path.name, source="file"):
+            return self.load(self.path)
+
+
+catalog = Catalog(DATA_CSV, load=load_products, store=ArrowStore(SNAPSHOT_DIR))
+
+
+def memory_report(path: Path) -> pd.DataFrame:
+    """Bytes per product for each column, plain ``read_csv`` vs compact layout"""
+    plain = pd.read_csv(path).memory_usage(deep=True, index=False)
+    compact = load_products(path)
+    rows = max(len(compact), 1)
+    report = pd.DataFrame({
+        "plain": plain / rows,
+        "compact": compact.memory_usage(deep=True, index=False).reindex(plain.index, fill_value=0) / rows,
+    })
+    report.loc["total"] = report.sum()
+    return report.round(1)
+
+
+if __name__ == "__main__":
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else DATA_CSV
+    report = memory_report(path)
+    print(f"{path.name}: bytes per product")
+    print(report.to_string())
+    print(f"{report.loc['total', 'plain'] / report.loc['total', 'compact']:.1f}x smaller")
@@ -0,0 +1,66 @@
+"""
+Server-Sent Events broker for scrape progress and dataset updates
+"""
+import asyncio
+import json
+from typing import Optional, Set
+
+# Per-client queue size; slow clients drop their oldest pending events
+QUEUE_SIZE = 32
+
+
+class EventBroker:
+    """Fans out one formatted message to every connected client.
+
+    Publishing is safe from any thread: the scheduler runs in a worker thread,
+    so messages are handed to the event loop with ``call_soon_threadsafe``.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Attach the broker to the application's event loop"""
+        self._loop = loop
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, event: str, data: dict):
+        """Broadcast an event to all subscribers"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        message = format_event(event, data)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._fanout(message)
+        else:
+            loop.call_soon_threadsafe(self._fanout, message)
+
+    def _fanout(self, message: str):
+        for queue in list(self._subscribers):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+
+def format_event(event: str, data: dict) -> str:
+    """Encode an event in the text/event-stream wire format"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+broker = EventBroker()
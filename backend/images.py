@@ -0,0 +1,281 @@
+"""
+Product image proxy: fetch each retailer image once, serve resized WebP/JPEG
+
+Originals are stored under the SHA-256 of their bytes, so the same picture
+listed under several URLs is kept once; an index file per source URL points at
+that digest. Thumbnails are derived from the original per (width, format) and
+everything shares one size budget, evicted least recently used first (reads
+bump the file's mtime). Files are written to a temp name and renamed, so API
+workers can share the directory.
+
+Run ``python backend/images.py`` to prefetch every image of the current catalog.
+"""
+import hashlib
+import io
+import logging
+import mimetypes
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from catalog import PROJECT_ROOT
+from metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = PROJECT_ROOT / ".cache" / "images"
+MAX_CACHE_BYTES = int(os.environ.get("IMAGE_CACHE_MB", "500")) * 1024 * 1024
+
+# Only retailer CDNs; anything else would turn the proxy into an open relay
+ALLOWED_HOSTS = {"ma.jumia.is", "media.electroplanet.ma"}
+
+# Thumbnail widths (px); cards show images at ~170px, so 160 for 1x and 320 for 2x screens
+SIZES = (80, 160, 320)
+DEFAULT_SIZE = 320
+
+FORMATS = {"webp": ("WEBP", "image/webp"), "jpeg": ("JPEG", "image/jpeg")}
+QUALITY = 80
+
+MAX_SOURCE_BYTES = 10 * 1024 * 1024
+FETCH_TIMEOUT = 10
+MAX_REDIRECTS = 3
+PREFETCH_WORKERS = 8
+
+USER_AGENT = "Mozilla/5.0 (compatible; ElectronicsHotDeals image cache)"
+
+
+class ImageUnavailable(Exception):
+    """The source image could not be fetched or decoded"""
+
+
+class ImageCache:
+    """Content-addressed disk cache of source images and their thumbnails"""
+
+    def __init__(self, root: Path = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._session = None
+        self._evict_lock = threading.Lock()
+        self._written = 0
+
+    # --- paths --------------------------------------------------------------
+
+    def _url_path(self, url: str) -> Path:
+        key = hashlib.sha1(url.encode()).hexdigest()
+        return self.root / "urls" / key[:2] / key
+
+    def _original_path(self, digest: str) -> Path:
+        return self.root / "originals" / digest[:2] / digest
+
+    def _thumb_path(self, digest: str, width: int, fmt: str) -> Path:
+        return self.root / "thumbs" / digest[:2] / f"{digest}-{width}.{fmt}"
+
+    # --- public API -----------------------------------------------------------
+
+    @staticmethod
+    def check_url(url: str) -> None:
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or parsed.hostname not in ALLOWED_HOSTS:
+            raise ValueError(f"Images are only proxied from {', '.join(sorted(ALLOWED_HOSTS))}")
+
+    def thumbnail(self, url: str, width: int = DEFAULT_SIZE, fmt: str = "webp") -> Tuple[bytes, str, str]:
+        """``(body, media type, etag)`` of ``url`` resized to fit ``width`` px"""
+        if width not in SIZES:
+            raise ValueError(f"width must be one of {SIZES}")
+        if fmt not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+        self.check_url(url)
+
+        digest = self._digest(url)
+        path = self._thumb_path(digest, width, fmt)
+        data = self._read(path)
+        if data is not None:
+            CACHE_REQUESTS.inc(cache="images", result="hit")
+            return data, FORMATS[fmt][1], f'"{path.name}"'
+
+        CACHE_REQUESTS.inc(cache="images", result="miss")
+        original = self._read(self._original_path(digest))
+        if original is None:
+            # evicted since the URL was indexed
+            digest = self._fetch(url)
+            original = self._read(self._original_path(digest))
+            path = self._thumb_path(digest, width, fmt)
+        if Image is None:
+            # no Pillow: serve the original untouched
+            media_type = mimetypes.guess_type(urlparse(url).path)[0] or "application/octet-stream"
+            return original, media_type, f'"{digest}"'
+        data = self._resize(original, width, fmt)
+        self._write(path, data)
+        return data, FORMATS[fmt][1], f'"{path.name}"'
+
+    def prefetch(self, urls: Iterable[str], fmt: str = "webp") -> dict:
+        """Fetch and resize every new image in ``urls`` to all sizes, a few at a time"""
+        todo = []
+        for url in dict.fromkeys(u for u in urls if isinstance(u, str)):
+            try:
+                self.check_url(url)
+            except ValueError:
+                continue
+            if not self._url_path(url).exists():
+                todo.append(url)
+
+        def one(url: str) -> bool:
+            try:
+                for width in SIZES:
+                    self.thumbnail(url, width, fmt)
+                return True
+            except ImageUnavailable as e:
+                logger.warning(f"Image prefetch failed: {e}")
+                return False
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(PREFETCH_WORKERS) as pool:
+            fetched = sum(pool.map(one, todo))
+        return {"new": len(todo), "fetched": fetched, "seconds": round(time.perf_counter() - start, 1)}
+
+    # --- internals ------------------------------------------------------------
+
+    def _digest(self, url: str) -> str:
+        index = self._url_path(url)
+        try:
+            return index.read_text().strip()
+        except FileNotFoundError:
+            return self._fetch(url)
+
+    def _fetch(self, url: str) -> str:
+        # requests is only needed once something is missing from the cache, not at API startup
+        import requests
+
+        if self._session is None:
+            self._session = requests.Session()
+            self._session.headers["User-Agent"] = USER_AGENT
+        try:
+            data = self._download(url)
+        except requests.RequestException as e:
+            raise ImageUnavailable(f"{url}: {e}") from e
+        if len(data) > MAX_SOURCE_BYTES:
+            raise ImageUnavailable(f"{url}: larger than {MAX_SOURCE_BYTES} bytes")
+
+        digest = hashlib.sha256(data).hexdigest()
+        if Image is not None:
+            try:
+                Image.open(io.BytesIO(data)).verify()
+            except Exception as e:
+                raise ImageUnavailable(f"{url}: not an image ({e})") from e
+        self._write(self._original_path(digest), data)
+        self._write(self._url_path(url), digest.encode())
+        return digest
+
+    def _download(self, url: str) -> bytes:
+        """Body of ``url``, following redirects only while they stay on an allowed host"""
+        hop = url
+        for _ in range(MAX_REDIRECTS + 1):
+            # redirects are followed by hand: requests would fetch the next hop before we could check it
+            with self._session.get(hop, timeout=FETCH_TIMEOUT, stream=True, allow_redirects=False) as r:
+                if not r.is_redirect:
+                    r.raise_for_status()
+                    return r.raw.read(MAX_SOURCE_BYTES + 1, decode_content=True)
+                hop = urljoin(r.url, r.headers["location"])
+            try:
+                self.check_url(hop)
+            except ValueError:
+                raise ImageUnavailable(f"{url}: redirected off the allowed hosts to {hop}")
+        raise ImageUnavailable(f"{url}: more than {MAX_REDIRECTS} redirects")
+
+    @staticmethod
+    def _resize(data: bytes, width: int, fmt: str) -> bytes:
+        with Image.open(io.BytesIO(data)) as img:
+            img.draft("RGB", (width, width))  # lets JPEG decode at a reduced scale
+            keep_alpha = fmt == "webp" and img.mode in ("RGBA", "LA", "P")
+            img = img.convert("RGBA" if keep_alpha else "RGB")
+            img.thumbnail((width, width), Image.LANCZOS)
+            out = io.BytesIO()
+            pil_format = FORMATS[fmt][0]
+            if pil_format == "JPEG":
+                img.save(out, pil_format, quality=QUALITY, optimize=True, progressive=True)
+            else:
+                img.save(out, pil_format, quality=QUALITY, method=4)
+        return out.getvalue()
+
+    @staticmethod
+    def _read(path: Path) -> Optional[bytes]:
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)  # mark as recently used for eviction
+        except OSError:
+            pass
+        return data
+
+    def _write(self, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        self._written += len(data)
+        # a full directory scan is only worth it every few MB of new files
+        if self._written > self.max_bytes // 20:
+            self._written = 0
+            self.evict()
+
+    def evict(self) -> int:
+        """Delete least recently used files until the cache fits its budget"""
+        if not self._evict_lock.acquire(blocking=False):
+            return 0
+        try:
+            files = []
+            for path in self.root.rglob("*"):
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                if path.is_file():
+                    files.append((st.st_mtime, st.st_size, path))
+            total = sum(size for _, size, _ in files)
+            removed = 0
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            if removed:
+                logger.info(f"Evicted {removed} cached images")
+            return removed
+        finally:
+            self._evict_lock.release()
+
+
+image_cache = ImageCache()
+
+
+def catalog_image_urls() -> list:
+    """Image URLs of the served catalog and of the cross-retailer offers"""
+    from catalog import catalog, output_frame
+    from routes.matches import matches
+
+    df = catalog.get().df
+    urls = output_frame(df[["image_url"]])["image_url"].dropna().tolist() if "image_url" in df else []
+    offers = matches.get().df
+    if "other_image" in offers:
+        urls += offers["other_image"].dropna().tolist()
+    return urls
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(image_cache.prefetch(catalog_image_urls()))
@@ -1,38 +1,113 @@
 """
 FastAPI Backend for ElectronicsHotDeals
 """
+import time
+_import_started = time.perf_counter()
+
 import sys
+import asyncio
 from pathlib import Path
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
-
-from routes.products import router as products_router
-from scheduler import create_scheduler, run_scraping_pipeline, get_scrape_status
+# Pipeline modules (cleaning, product space) live in the project root
+sys.path.append(str(Path(__file__).parent.parent))
+
+from routes.products import router as products_router, product_records
+from routes.events import router as events_router
+from routes.chat import router as chat_router
+from routes.matches import router as matches_router
+from routes.images import router as images_router
+from scheduler import (
+    acquire_scheduler_lock, create_scheduler, run_scraping_pipeline, pipeline_busy, build_scrape_status,
+    watch_shared_state,
+)
 from models import ScrapeStatus
+from events import broker
+from metrics import CONTENT_TYPE, STARTUP_SECONDS, MetricsMiddleware, registry
+from catalog import catalog
+from views import deal_scores, facets
 
-# Scheduler instance
+STARTUP_SECONDS.set(time.perf_counter() - _import_started, phase="import")
+
+# Scheduler instance, and the lock that makes this worker the one running it
 scheduler = None
+scheduler_lock = None
+
+# Reported by /api/ready; "ready" once the catalog is loaded and its aggregates are warm
+startup = {
+    "status": "starting",
+    "version": None,
+    "products_count": 0,
+    "import_seconds": round(time.perf_counter() - _import_started, 3),
+    "preload_seconds": None,
+}
+
+
+def preload():
+    """Load the catalog and build the aggregates every page asks for"""
+    started = time.perf_counter()
+    snapshot = catalog.get()
+    if snapshot.version is None:
+        return
+    facets(snapshot)
+    deal_scores(snapshot)
+    # first pass through the row serializer is several times slower than later ones
+    product_records(snapshot.df.head(20))
+    seconds = time.perf_counter() - started
+    STARTUP_SECONDS.set(seconds, phase="preload")
+    startup.update(
+        status="ready",
+        version=snapshot.version,
+        products_count=len(snapshot.df),
+        preload_seconds=round(seconds, 3),
+    )
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
-    global scheduler
-    # Start scheduler on startup
-    scheduler = create_scheduler(interval_hours=6)
-    scheduler.start()
-    print("🚀 Scheduler started - auto-scraping every 6 hours")
+    global scheduler, scheduler_lock
+    # Let the scheduler thread push events onto this loop
+    broker.bind(asyncio.get_running_loop())
+    # Merge /metrics across gunicorn workers
+    registry.share()
+    
+    # Load the dataset before accepting traffic so the first request is not a cold one
+    try:
+        await asyncio.to_thread(preload)
+        if startup["status"] == "ready":
+            print(f"📦 Catalog preloaded: {startup['products_count']} products in {startup['preload_seconds']}s")
+        else:
+            print("⚠️ No dataset yet - /api/ready reports 'starting' until a scrape publishes one")
+    except Exception as e:
+        print(f"⚠️ Catalog preload failed, retrying on /api/ready: {e}")
+    
+    # Start scheduler on startup, in one worker only
+    scheduler_lock = acquire_scheduler_lock()
+    if scheduler_lock:
+        scheduler = create_scheduler(interval_hours=6)
+        scheduler.start()
+        print("🚀 Scheduler started - auto-scraping every 6 hours")
+    else:
+        print("⏸️ Scheduler not started here (another worker runs it, or RUN_SCHEDULER=0)")
+    
+    # Relay status and dataset changes made by the other workers to this one's clients
+    watcher = asyncio.create_task(watch_shared_state())
     
     yield
     
+    watcher.cancel()
+    
     # Shutdown scheduler
     if scheduler:
         scheduler.shutdown()
+        scheduler_lock.close()
         print("🛑 Scheduler stopped")
 
 
@@ -58,9 +133,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # Register routes
 app.include_router(products_router)
+app.include_router(events_router)
+app.include_router(chat_router)
+app.include_router(matches_router)
+app.include_router(images_router)
 
 
 @app.get("/")
@@ -69,36 +149,36 @@ async def root():
     return {"status": "ok", "message": "ElectronicsHotDeals API is running"}
 
 
+@app.get("/api/ready")
+async def ready(response: Response):
+    """Readiness probe: 503 while the catalog is still starting up"""
+    if startup["status"] != "ready":
+        # e.g. no dataset at boot: becomes ready once a scrape publishes one
+        try:
+            await asyncio.to_thread(preload)
+        except Exception:
+            pass
+    if startup["status"] != "ready":
+        response.status_code = 503
+    return startup
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics, merged across the API workers"""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
 @app.get("/api/scrape/status", response_model=ScrapeStatus)
 async def scrape_status():
     """Get the current scraping status"""
-    status = get_scrape_status()
-    
-    # Get product count from data file
-    data_file = Path(__file__).parent.parent / "jumia_products_clean.csv"
-    products_count = 0
-    if data_file.exists():
-        import pandas as pd
-        try:
-            df = pd.read_csv(data_file)
-            products_count = len(df)
-        except:
-            pass
-    
-    return ScrapeStatus(
-        last_scrape=status.get("last_scrape"),
-        status=status.get("status", "unknown"),
-        products_count=products_count,
-        is_running=status.get("is_running", False),
-    )
+    return build_scrape_status()
 
 
 @app.post("/api/scrape/trigger")
 async def trigger_scrape(background_tasks: BackgroundTasks):
     """Manually trigger a scrape"""
-    status = get_scrape_status()
-    
-    if status.get("is_running"):
+    if pipeline_busy():
         return {"success": False, "message": "Scraping already in progress"}
     
     background_tasks.add_task(run_scraping_pipeline)
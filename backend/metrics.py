@@ -0,0 +1,317 @@
+"""
+Prometheus-style metrics: counters, gauges and histograms rendered at /metrics
+
+Values are kept per process in plain dicts behind a lock; recording one costs
+a dict lookup and an addition. Pipeline scripts run as subprocesses, so they
+print a single ``METRICS {json}`` line that the scheduler folds in here.
+
+With several API workers, ``registry.share()`` makes each one write its values
+to ``.cache/metrics/<pid>.json`` every few seconds, and ``/metrics`` on any
+worker merges all files: counters and histograms are summed (dead workers'
+counts included, as in prometheus_client's multiprocess mode), gauges keep one
+series per live worker under a ``worker`` label.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Seconds; covers in-memory API calls up to multi-minute scrapes
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 600)
+
+STATS_PREFIX = "METRICS "
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Where workers share their values; see Registry.share
+METRICS_DIR = Path(os.environ.get("METRICS_DIR") or Path(__file__).parent.parent / ".cache" / "metrics")
+SHARE_SECONDS = 5
+# A file not rewritten for this long belongs to a dead worker: its gauges are dropped
+STALE_SECONDS = 60
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def snapshot(self) -> list:
+        """``[[label values], value]`` pairs, JSON-ready"""
+        with self._lock:
+            return [[list(k), list(v) if isinstance(v, list) else v] for k, v in self._values.items()]
+
+    def merge(self, totals: dict, key: Tuple[str, ...], value, worker: str) -> None:
+        """Add one process's ``value`` for ``key`` to ``totals``"""
+        totals[key] = totals.get(key, 0) + value
+
+    def render(self, values: Optional[dict] = None, labelnames: Optional[Tuple[str, ...]] = None) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        names = labelnames or self.labelnames
+        for key, value in sorted(values.items()):
+            lines.extend(self._samples(key, value, names))
+        return lines
+
+    def _samples(self, key, value, names) -> List[str]:
+        return [f"{self.name}{_labels(names, key)} {_number(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def merge(self, totals: dict, key: Tuple[str, ...], value, worker: str) -> None:
+        # summing gauges (startup time, last run's rate) means nothing: one series per worker
+        totals[(*key, worker)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                # one slot per bucket, then +Inf, then the running sum
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[i] += 1
+            counts[-1] += value
+
+    def time(self, **labels: str) -> "_Timer":
+        return _Timer(self, labels)
+
+    def merge(self, totals: dict, key: Tuple[str, ...], value, worker: str) -> None:
+        counts = totals.get(key)
+        if counts is None:
+            totals[key] = list(value)
+        elif len(counts) == len(value):  # same buckets
+            totals[key] = [a + b for a, b in zip(counts, value)]
+
+    def _samples(self, key, counts, names) -> List[str]:
+        lines, total = [], 0
+        for bound, count in zip([*self.buckets, "+Inf"], counts[:-1]):
+            total += count
+            le = 'le="+Inf"' if bound == "+Inf" else f'le="{_number(bound)}"'
+            lines.append(f"{self.name}_bucket{_labels(names, key, le)} {total}")
+        labels = _labels(names, key)
+        lines.append(f"{self.name}_sum{labels} {_number(counts[-1])}")
+        lines.append(f"{self.name}_count{labels} {total}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self.directory: Optional[Path] = None
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def share(self, directory: Path = METRICS_DIR, interval: float = SHARE_SECONDS) -> None:
+        """Write this process's values under ``directory`` periodically so every worker's /metrics covers all"""
+        directory.mkdir(parents=True, exist_ok=True)
+        self.directory = directory
+        self._dump()
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self._dump()
+                except OSError:
+                    pass
+
+        threading.Thread(target=loop, name="metrics-share", daemon=True).start()
+
+    def _dump(self) -> None:
+        data = {m.name: m.snapshot() for m in self._metrics}
+        path = self.directory / f"{os.getpid()}.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, path)
+
+    def _collect(self) -> Dict[str, dict]:
+        """Values of every worker's file, merged per metric"""
+        totals: Dict[str, dict] = {m.name: {} for m in self._metrics}
+        now = time.time()
+        for path in self.directory.glob("*.json"):
+            try:
+                live = now - path.stat().st_mtime < STALE_SECONDS
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            for m in self._metrics:
+                if isinstance(m, Gauge) and not live:
+                    continue
+                for key, value in data.get(m.name, []):
+                    m.merge(totals[m.name], tuple(key), value, worker=path.stem)
+        return totals
+
+    def render(self) -> str:
+        if self.directory is None:
+            return "\n".join(line for m in self._metrics for line in m.render()) + "\n"
+        self._dump()
+        totals = self._collect()
+        lines = []
+        for m in self._metrics:
+            names = (*m.labelnames, "worker") if isinstance(m, Gauge) else m.labelnames
+            lines.extend(m.render(totals[m.name], names))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# --- API ----------------------------------------------------------------------
+REQUEST_SECONDS = registry.register(Histogram(
+    "http_request_duration_seconds", "Time to response headers per route",
+    ["method", "route", "status"],
+))
+CACHE_REQUESTS = registry.register(Counter(
+    "cache_requests_total", "Lookups in per-version and answer caches", ["cache", "result"],
+))
+DATASET_LOAD_SECONDS = registry.register(Histogram(
+    "dataset_load_seconds", "Time to load a dataset version into memory", ["dataset", "source"],
+))
+DATASET_SWAP_SECONDS = registry.register(Histogram(
+    "dataset_swap_seconds", "Time from detecting a new version to serving it, lock wait included", ["dataset"],
+))
+DATASET_ROWS = registry.register(Gauge(
+    "dataset_rows", "Rows in the dataset version being served", ["dataset"],
+))
+STARTUP_SECONDS = registry.register(Gauge(
+    "startup_seconds", "Time spent in each startup phase of this worker (import, preload)", ["phase"],
+))
+
+# --- Pipeline -----------------------------------------------------------------
+PIPELINE_STAGE_SECONDS = registry.register(Histogram(
+    "pipeline_stage_seconds", "Wall time of each scraping pipeline stage", ["stage"],
+))
+PIPELINE_ROWS = registry.register(Counter(
+    "pipeline_rows_total", "Rows produced by each pipeline stage", ["stage"],
+))
+PIPELINE_ROWS_PER_SECOND = registry.register(Gauge(
+    "pipeline_rows_per_second", "Row throughput of the last run (parse_listing, clean)", ["stage"],
+))
+SCRAPE_PAGES = registry.register(Counter(
+    "scrape_pages_total", "Listing pages requested",
+))
+SCRAPE_PAGES_PER_SECOND = registry.register(Gauge(
+    "scrape_pages_per_second", "Pages per second of the last scrape, politeness delays included",
+))
+SCRAPE_RESPONSES = registry.register(Counter(
+    "scrape_http_responses_total", "HTTP responses received while scraping", ["status"],
+))
+SCRAPE_FETCHES = registry.register(Counter(
+    "scrape_fetches_total", "Scraper page fetches by outcome (network, stored, revalidated, retries, failed, skipped)", ["outcome"],
+))
+
+
+def record_pipeline_output(stage: str, stdout: str) -> None:
+    """Fold the ``METRICS {json}`` line printed by a pipeline script into the registry"""
+    for line in (stdout or "").splitlines():
+        if not line.startswith(STATS_PREFIX):
+            continue
+        try:
+            stats = json.loads(line[len(STATS_PREFIX):])
+        except ValueError:
+            continue
+        if "rows" in stats:
+            PIPELINE_ROWS.inc(stats["rows"], stage=stage)
+        if "rows_per_sec" in stats:
+            PIPELINE_ROWS_PER_SECOND.set(stats["rows_per_sec"], stage=stage)
+        if "pages" in stats:
+            SCRAPE_PAGES.inc(stats["pages"])
+        if "pages_per_sec" in stats:
+            SCRAPE_PAGES_PER_SECOND.set(stats["pages_per_sec"])
+        for status, count in stats.get("http_status", {}).items():
+            SCRAPE_RESPONSES.inc(count, status=status)
+        for outcome, count in stats.get("fetch", {}).items():
+            SCRAPE_FETCHES.inc(count, outcome=outcome)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # the router stores the matched route on the shared scope
+                route = scope.get("route")
+                REQUEST_SECONDS.observe(
+                    time.perf_counter() - start,
+                    method=scope["method"],
+                    route=getattr(route, "path", "unmatched"),
+                    status=str(message["status"]),
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
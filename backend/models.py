@@ -20,6 +20,8 @@ class ProductListResponse(BaseModel):
     total: int
     page: int
     per_page: int
+    next_cursor: Optional[str] = None
+    version: Optional[str] = None
 
 
 class StatsResponse(BaseModel):
@@ -44,8 +46,46 @@ class TopDeal(BaseModel):
     deal_score: float
 
 
+class SpacePoint(BaseModel):
+    x: float
+    y: float
+    title: Optional[str] = None
+    brand: Optional[str] = None
+    type_product: Optional[str] = None
+    price: Optional[float] = None
+
+
+class ProductSpaceResponse(BaseModel):
+    points: List[SpacePoint]
+    total: int
+    sampled: bool
+    version: Optional[str] = None
+
+
+class ChatQueryResponse(BaseModel):
+    query: str
+    intents: dict
+    total: int
+    products: List[Product]
+    version: Optional[str] = None
+
+
+class CheaperOffer(BaseModel):
+    title: Optional[str] = None
+    product_link: Optional[str] = None
+    price: Optional[float] = None
+    retailer: str
+    other_title: Optional[str] = None
+    other_link: Optional[str] = None
+    other_image: Optional[str] = None
+    other_price: Optional[float] = None
+    savings: float
+    score: float
+
+
 class ScrapeStatus(BaseModel):
     last_scrape: Optional[datetime] = None
     status: str
     products_count: int
     is_running: bool
+    data_version: Optional[str] = None
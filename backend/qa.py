@@ -0,0 +1,173 @@
+"""
+Catalog Q&A: compact retrieval context and answer cache for the Gemini tab
+
+Run ``python backend/qa.py "best tv under 5000"`` to measure prompt size and
+latency offline with the bundled fake model.
+"""
+import sys
+import time
+import textwrap
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Protocol
+
+import pandas as pd
+
+from catalog import CatalogSnapshot, catalog
+from metrics import CACHE_REQUESTS
+from search import parse_query, search
+
+# Rough characters-per-token ratio used to budget the prompt
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_BUDGET = 1500
+MAX_CONTEXT_ROWS = 60
+TITLE_CHARS = 70
+
+PROMPT_TEMPLATE = textwrap.dedent("""\
+    You are an e-commerce expert. Use ONLY this catalog data.
+    {summary}
+    Most relevant products ({shown} of {total}), prices in Dhs:
+    {table}
+    Question: {question}
+    If data is insufficient say so.""")
+
+
+class ModelClient(Protocol):
+    """Anything with Gemini's ``generate_content(prompt).text`` interface"""
+
+    def generate_content(self, prompt: str): ...
+
+
+@dataclass
+class FakeResponse:
+    text: str
+
+
+class FakeModel:
+    """Offline stand-in for ``genai.GenerativeModel`` used in benchmarks"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.prompts: List[str] = []
+
+    def generate_content(self, prompt: str) -> FakeResponse:
+        self.prompts.append(prompt)
+        if self.latency:
+            time.sleep(self.latency)
+        rows = prompt.count("\n")
+        return FakeResponse(text=f"(fake answer from a {len(prompt)}-char, {rows}-line prompt)")
+
+
+@dataclass
+class Answer:
+    text: str
+    prompt_chars: int
+    rows: int
+    cached: bool
+    seconds: float
+
+
+def _summary(df: pd.DataFrame) -> str:
+    """One-line catalog overview so aggregate questions still have context"""
+    parts = [f"Catalog: {len(df):,} products"]
+    if "price_numeric" in df:
+        parts.append(f"avg price {df['price_numeric'].mean():,.0f} Dhs")
+    if "discount_percentage" in df:
+        parts.append(f"avg discount {df['discount_percentage'].mean():.1f}%")
+    if "category" in df:
+        counts = df["category"].value_counts()
+        parts.append("categories " + ", ".join(f"{c} {n}" for c, n in counts.items()))
+    return "; ".join(parts) + "."
+
+
+def _fmt(value, pattern: str = "{}") -> str:
+    return "" if pd.isna(value) else pattern.format(value)
+
+
+def _row_line(row: dict) -> str:
+    return "|".join([
+        _fmt(row.get("title"))[:TITLE_CHARS],
+        _fmt(row.get("brand")),
+        _fmt(row.get("type_product")),
+        _fmt(row.get("price_numeric"), "{:.0f}"),
+        _fmt(row.get("old_price_numeric"), "{:.0f}"),
+        _fmt(row.get("discount_percentage"), "{:.0f}%"),
+    ])
+
+
+def build_context(snapshot: CatalogSnapshot, question: str, token_budget: int = DEFAULT_TOKEN_BUDGET) -> Dict:
+    """Pick the rows relevant to ``question`` and pack them into a compact table"""
+    df = snapshot.df
+    summary = snapshot.derived("qa_summary", _summary)
+    lines: Dict[int, str] = snapshot.derived("qa_lines", lambda _: {})
+
+    positions, total = search(snapshot, parse_query(question), MAX_CONTEXT_ROWS)
+    budget = token_budget * CHARS_PER_TOKEN - len(summary) - len(question)
+    table = ["title|brand|type|price|old price|discount"]
+    used = len(table[0])
+    for pos in positions:
+        pos = int(pos)
+        if pos not in lines:
+            lines[pos] = _row_line(df.iloc[pos].to_dict())
+        line = lines[pos]
+        if used + len(line) + 1 > budget:
+            break
+        table.append(line)
+        used += len(line) + 1
+
+    return {
+        "summary": summary,
+        "table": "\n".join(table),
+        "shown": len(table) - 1,
+        "total": total,
+    }
+
+
+def build_prompt(snapshot: CatalogSnapshot, question: str, token_budget: int = DEFAULT_TOKEN_BUDGET) -> str:
+    ctx = build_context(snapshot, question, token_budget)
+    return PROMPT_TEMPLATE.format(question=question, **ctx)
+
+
+class CatalogQA:
+    """Answers questions with a retrieved context and caches them per dataset version"""
+
+    def __init__(self, model: ModelClient, cache_size: int = 256, token_budget: int = DEFAULT_TOKEN_BUDGET):
+        self.model = model
+        self.cache_size = cache_size
+        self.token_budget = token_budget
+        self._cache: "OrderedDict[tuple, Answer]" = OrderedDict()
+
+    def ask(self, question: str, snapshot: Optional[CatalogSnapshot] = None) -> Answer:
+        snapshot = snapshot or catalog.get()
+        key = (snapshot.version, " ".join(question.lower().split()))
+        if key in self._cache:
+            CACHE_REQUESTS.inc(cache="qa_answers", result="hit")
+            self._cache.move_to_end(key)
+            hit = self._cache[key]
+            return Answer(hit.text, hit.prompt_chars, hit.rows, cached=True, seconds=0.0)
+
+        CACHE_REQUESTS.inc(cache="qa_answers", result="miss")
+        start = time.perf_counter()
+        ctx = build_context(snapshot, question, self.token_budget)
+        prompt = PROMPT_TEMPLATE.format(question=question, **ctx)
+        text = self.model.generate_content(prompt).text
+        answer = Answer(text, len(prompt), ctx["shown"], cached=False, seconds=time.perf_counter() - start)
+
+        self._cache[key] = answer
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return answer
+
+
+if __name__ == "__main__":
+    questions = sys.argv[1:] or [
+        "Best laptops under 5000 Dhs",
+        "Which Samsung phone has the biggest discount?",
+        "What is the average TV price?",
+    ]
+    qa = CatalogQA(FakeModel())
+    snapshot = catalog.get()
+    for q in questions + questions:
+        ans = qa.ask(q, snapshot)
+        print(f"{q!r}: {ans.prompt_chars:,} chars (~{ans.prompt_chars // CHARS_PER_TOKEN:,} tokens), "
+              f"{ans.rows} rows, {ans.seconds * 1000:.1f} ms{' (cached)' if ans.cached else ''}")
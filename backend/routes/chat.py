@@ -0,0 +1,35 @@
+"""
+Chat assistant routes
+"""
+from fastapi import APIRouter, Query
+
+from models import Product, ChatQueryResponse
+from catalog import catalog
+from search import parse_query, search
+from routes.products import product_records
+
+router = APIRouter(prefix="/api/chat", tags=["chat"])
+
+
+@router.get("/query", response_model=ChatQueryResponse)
+async def chat_query(
+    q: str = Query(..., min_length=1, max_length=300),
+    limit: int = Query(8, ge=1, le=50),
+):
+    """Answer a natural-language product question over the full catalog"""
+    parsed = parse_query(q)
+    snapshot = catalog.get()
+
+    if snapshot.df.empty:
+        return ChatQueryResponse(query=q, intents=parsed.to_dict(), total=0, products=[], version=snapshot.version)
+
+    positions, total = search(snapshot, parsed, limit)
+    products = [Product(**rec) for rec in product_records(snapshot.df.iloc[positions])]
+
+    return ChatQueryResponse(
+        query=q,
+        intents=parsed.to_dict(),
+        total=total,
+        products=products,
+        version=snapshot.version,
+    )
@@ -0,0 +1,43 @@
+"""
+Server-Sent Events stream for scrape status and dataset updates
+"""
+import asyncio
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from events import broker, format_event
+from scheduler import build_scrape_status
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+# Comment line sent periodically so proxies keep idle connections open
+KEEPALIVE_SECONDS = 15
+
+
+@router.get("")
+async def stream_events(request: Request):
+    """Push `status` and `dataset` events to the client as they happen"""
+    queue = broker.subscribe()
+
+    async def event_stream():
+        try:
+            # Send the current state first so clients need no extra request
+            yield format_event("status", build_scrape_status().model_dump(mode="json"))
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield message
+        finally:
+            broker.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
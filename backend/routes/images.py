@@ -0,0 +1,33 @@
+"""
+Image proxy routes
+"""
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response
+
+from images import DEFAULT_SIZE, ImageUnavailable, image_cache
+
+router = APIRouter(prefix="/api/images", tags=["images"])
+
+# Thumbnails never change for a given source URL, so clients and CDNs may keep them for a year
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("")
+def get_image(
+    request: Request,
+    url: str = Query(..., description="Retailer image URL (Jumia or Electroplanet CDN)"),
+    w: int = Query(DEFAULT_SIZE, description="Thumbnail width: 80, 160 or 320"),
+    fmt: str = Query("webp", alias="format", pattern="^(webp|jpeg)$"),
+):
+    """Resized, cached copy of a product image"""
+    try:
+        body, media_type, etag = image_cache.thumbnail(url, w, fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImageUnavailable as e:
+        raise HTTPException(status_code=502, detail=f"Image unavailable: {e}")
+
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=media_type, headers=headers)
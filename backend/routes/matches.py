@@ -0,0 +1,38 @@
+"""
+Cross-retailer match routes
+"""
+from fastapi import APIRouter, Query
+from typing import Optional, List
+import pandas as pd
+
+from models import CheaperOffer
+from catalog import Catalog, PROJECT_ROOT
+from routes.products import product_records
+
+router = APIRouter(prefix="/api/matches", tags=["matches"])
+
+# Written by match_retailers.py after each cleaning run
+matches = Catalog(PROJECT_ROOT / "product_matches.csv")
+
+
+def _cheaper(df: pd.DataFrame) -> pd.DataFrame:
+    """Offers priced below the Jumia listing, biggest savings first"""
+    if df.empty:
+        return df
+    df = df[df["other_price"] < df["price"]].copy()
+    df["savings"] = df["price"] - df["other_price"]
+    return df.sort_values("savings", ascending=False)
+
+
+@router.get("/cheaper-elsewhere", response_model=List[CheaperOffer])
+async def cheaper_elsewhere(
+    product_link: Optional[str] = Query(None, description="Only offers for this Jumia product"),
+    limit: int = Query(20, ge=1, le=200),
+):
+    """Same product, cheaper at another retailer"""
+    offers = matches.get().derived("cheaper", _cheaper)
+    if offers.empty:
+        return []
+    if product_link:
+        offers = offers[offers["product_link"] == product_link]
+    return [CheaperOffer(**rec) for rec in product_records(offers.head(limit), list(CheaperOffer.model_fields))]
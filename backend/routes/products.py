@@ -1,103 +1,302 @@
 """
 Product API routes
 """
-from fastapi import APIRouter, Query
-from typing import Optional, List
+import io
+import json
+import base64
+import hashlib
+from dataclasses import dataclass, asdict
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Iterator, Optional, List
 import pandas as pd
 import numpy as np
-from pathlib import Path
 
-from models import Product, ProductListResponse, StatsResponse, TopDeal
+try:
+    import pyarrow as pa
+except ModuleNotFoundError:
+    pa = None
+
+from models import Product, ProductListResponse, StatsResponse, TopDeal, SpacePoint, ProductSpaceResponse
+from catalog import catalog, CatalogSnapshot, output_frame
+from views import facets, deal_scores, top_deals, product_space, sample_positions, isin_lower
 
 router = APIRouter(prefix="/api/products", tags=["products"])
 
-# Data file path
-DATA_CSV = Path(__file__).parent.parent.parent / "jumia_products_clean.csv"
+# Columns exposed by the API, in response order
+PRODUCT_COLUMNS = list(Product.model_fields)
+
+NUMERIC_COLUMNS = {"price_numeric", "old_price_numeric", "discount_percentage"}
+
+SORT_COLUMNS = {
+    "price": "price_numeric",
+    "discount": "discount_percentage",
+    "title": "title",
+}
+
+# Rows serialized per chunk when streaming an export
+EXPORT_CHUNK_ROWS = 5000
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+}
+
+
+@dataclass
+class ProductFilters:
+    """Query filters shared by the list and export endpoints"""
+    category: Optional[str] = None
+    brand: Optional[str] = None
+    type_product: Optional[str] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    search: Optional[str] = None
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """Boolean row mask; avoids copying the frame for every filter"""
+        mask = np.ones(len(df), dtype=bool)
+        if self.category:
+            mask &= isin_lower(df["category"], [self.category])
+        if self.brand:
+            mask &= isin_lower(df["brand"], [self.brand])
+        if self.type_product:
+            mask &= isin_lower(df["type_product"], [self.type_product])
+        if self.min_price is not None:
+            mask &= (df["price_numeric"] >= self.min_price).to_numpy()
+        if self.max_price is not None:
+            mask &= (df["price_numeric"] <= self.max_price).to_numpy()
+        if self.search:
+            mask &= df["title"].fillna('').str.contains(self.search, case=False, na=False).to_numpy()
+        return mask
+
+    def key(self) -> str:
+        """Short fingerprint used to tie a cursor to its filter set"""
+        raw = json.dumps(asdict(self), sort_keys=True)
+        return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+
+def sort_ranks(snapshot: CatalogSnapshot, sort_by: Optional[str], sort_order: str) -> np.ndarray:
+    """Position of every row in the requested sort order, computed once per version"""
+    def build(df: pd.DataFrame) -> np.ndarray:
+        sort_col = SORT_COLUMNS.get(sort_by)
+        if sort_col and sort_col in df.columns:
+            order = df[sort_col].sort_values(
+                ascending=(sort_order == "asc"), na_position="last", kind="stable"
+            ).index.to_numpy()
+        else:
+            order = np.arange(len(df))
+        ranks = np.empty(len(df), dtype=np.int64)
+        ranks[order] = np.arange(len(df))
+        return ranks
+
+    return snapshot.derived(f"ranks:{sort_by}:{sort_order}", build)
+
 
-# Trusted brands for deal scoring
-TRUSTED_BRANDS = {"samsung", "xiaomi", "apple", "lg", "sony", "dell", "hp", "lenovo", "huawei", "asus"}
+def encode_cursor(state: dict) -> str:
+    raw = json.dumps(state, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
 
 
-def load_data() -> pd.DataFrame:
-    """Load the cleaned product data"""
-    if not DATA_CSV.exists():
-        return pd.DataFrame()
-    return pd.read_csv(DATA_CSV)
+def decode_cursor(cursor: str) -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(raw)
+        int(state["r"])
+        return state
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def product_records(df: pd.DataFrame, columns: List[str] = PRODUCT_COLUMNS) -> List[dict]:
+    """Rows as plain dicts with NaN replaced by None"""
+    cols = [c for c in columns if c in df.columns]
+    sub = output_frame(df[cols])
+    return sub.astype(object).where(sub.notna(), None).to_dict("records")
 
 
 @router.get("", response_model=ProductListResponse)
 async def list_products(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=1000),
-    category: Optional[str] = None,
-    brand: Optional[str] = None,
-    type_product: Optional[str] = None,
-    min_price: Optional[float] = None,
-    max_price: Optional[float] = None,
-    search: Optional[str] = None,
-    sort_by: Optional[str] = Query(None, regex="^(price|discount|title)$"),
-    sort_order: Optional[str] = Query("asc", regex="^(asc|desc)$"),
+    filters: ProductFilters = Depends(),
+    sort_by: Optional[str] = Query(None, pattern="^(price|discount|title)$"),
+    sort_order: Optional[str] = Query("asc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous response; overrides page"),
 ):
-    """List products with filtering, pagination, and sorting"""
-    df = load_data()
+    """List products with filtering, pagination, and sorting.
+
+    Pass the returned ``next_cursor`` back as ``cursor`` to walk the whole
+    result set; cursors are tied to the dataset version and filter set.
+    """
+    snapshot = catalog.get()
+    df = snapshot.df
     
     if df.empty:
-        return ProductListResponse(products=[], total=0, page=page, per_page=per_page)
+        return ProductListResponse(products=[], total=0, page=page, per_page=per_page, version=snapshot.version)
     
     # Apply filters
-    if category:
-        df = df[df["category"].fillna('').str.lower() == category.lower()]
-    if brand:
-        df = df[df["brand"].fillna('').str.lower() == brand.lower()]
-    if type_product:
-        df = df[df["type_product"].fillna('').str.lower() == type_product.lower()]
-    if min_price is not None:
-        df = df[df["price_numeric"] >= min_price]
-    if max_price is not None:
-        df = df[df["price_numeric"] <= max_price]
-    if search:
-        df = df[df["title"].fillna('').str.contains(search, case=False, na=False)]
-    
-    # Apply sorting
-    if sort_by:
-        sort_col = {
-            "price": "price_numeric",
-            "discount": "discount_percentage",
-            "title": "title"
-        }.get(sort_by)
-        if sort_col and sort_col in df.columns:
-            df = df.sort_values(sort_col, ascending=(sort_order == "asc"), na_position="last")
+    positions = np.flatnonzero(filters.mask(df))
+    ranks = sort_ranks(snapshot, sort_by, sort_order)[positions]
+    total = len(positions)
+    sort_key = f"{sort_by}:{sort_order}"
     
-    # Pagination
-    total = len(df)
-    start = (page - 1) * per_page
+    # Keyset pagination: keep rows that sort after the cursor
+    if cursor:
+        state = decode_cursor(cursor)
+        if state.get("v") != snapshot.version:
+            raise HTTPException(status_code=410, detail="Dataset has changed, restart pagination")
+        if state.get("s") != sort_key or state.get("f") != filters.key():
+            raise HTTPException(status_code=400, detail="Cursor does not match the query")
+        after = ranks > state["r"]
+        positions, ranks = positions[after], ranks[after]
+        start = 0
+    else:
+        start = (page - 1) * per_page
     end = start + per_page
-    df_page = df.iloc[start:end]
-    
-    # Convert to products
-    products = []
-    for _, row in df_page.iterrows():
-        products.append(Product(
-            title=row.get("title") if pd.notna(row.get("title")) else None,
-            brand=row.get("brand") if pd.notna(row.get("brand")) else None,
-            type_product=row.get("type_product") if pd.notna(row.get("type_product")) else None,
-            price_numeric=row.get("price_numeric") if pd.notna(row.get("price_numeric")) else None,
-            old_price_numeric=row.get("old_price_numeric") if pd.notna(row.get("old_price_numeric")) else None,
-            discount_percentage=row.get("discount_percentage") if pd.notna(row.get("discount_percentage")) else None,
-            product_link=row.get("product_link") if pd.notna(row.get("product_link")) else None,
-            image_url=row.get("image_url") if pd.notna(row.get("image_url")) else None,
-            category=row.get("category") if pd.notna(row.get("category")) else None,
-        ))
     
-    return ProductListResponse(products=products, total=total, page=page, per_page=per_page)
+    # Only order the rows needed for this page
+    if end < len(ranks):
+        head = np.argpartition(ranks, end - 1)[:end]
+    else:
+        head = np.arange(len(ranks))
+    head = head[np.argsort(ranks[head], kind="stable")][start:end]
+    df_page = df.iloc[positions[head]]
+    
+    next_cursor = None
+    if len(head) and end < len(ranks):
+        next_cursor = encode_cursor({
+            "v": snapshot.version,
+            "s": sort_key,
+            "f": filters.key(),
+            "r": int(ranks[head[-1]]),
+        })
+    
+    products = [Product(**rec) for rec in product_records(df_page)]
+    
+    return ProductListResponse(
+        products=products,
+        total=total,
+        page=page,
+        per_page=per_page,
+        next_cursor=next_cursor,
+        version=snapshot.version,
+    )
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write target that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _arrow_schema():
+    return pa.schema([
+        pa.field(name, pa.float64() if name in NUMERIC_COLUMNS else pa.string())
+        for name in PRODUCT_COLUMNS
+    ])
+
+
+def _export_chunks(df: pd.DataFrame, positions: np.ndarray, fmt: str) -> Iterator[bytes]:
+    """Serialize rows chunk by chunk so memory stays bounded by EXPORT_CHUNK_ROWS"""
+    chunks = (
+        output_frame(df.iloc[positions[i:i + EXPORT_CHUNK_ROWS]].reindex(columns=PRODUCT_COLUMNS))
+        for i in range(0, len(positions), EXPORT_CHUNK_ROWS)
+    )
+    if fmt == "ndjson":
+        for chunk in chunks:
+            yield chunk.to_json(orient="records", lines=True, force_ascii=False).encode()
+    elif fmt == "csv":
+        yield (",".join(PRODUCT_COLUMNS) + "\n").encode()
+        for chunk in chunks:
+            yield chunk.to_csv(index=False, header=False).encode()
+    else:
+        schema = _arrow_schema()
+        sink = _ChunkSink()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            yield sink.drain()
+            for chunk in chunks:
+                writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+                yield sink.drain()
+        yield sink.drain()
+
+
+@router.get("/export")
+def export_products(
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv|arrow)$"),
+    filters: ProductFilters = Depends(),
+    sort_by: Optional[str] = Query(None, pattern="^(price|discount|title)$"),
+    sort_order: Optional[str] = Query("asc", pattern="^(asc|desc)$"),
+):
+    """Stream the full (filtered, sorted) catalog as NDJSON, CSV or Arrow"""
+    if fmt == "arrow" and pa is None:
+        raise HTTPException(status_code=501, detail="pyarrow is not installed on the server")
+    
+    # Hold on to one snapshot so a reload mid-stream cannot mix versions
+    snapshot = catalog.get()
+    df = snapshot.df
+    if df.empty:
+        positions = np.array([], dtype=np.int64)
+    else:
+        positions = np.flatnonzero(filters.mask(df))
+        positions = positions[np.argsort(sort_ranks(snapshot, sort_by, sort_order)[positions], kind="stable")]
+    
+    media_type, ext = EXPORT_FORMATS[fmt]
+    return StreamingResponse(
+        _export_chunks(df, positions, fmt),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="products.{ext}"',
+            "X-Dataset-Version": snapshot.version or "",
+        },
+    )
+
+
+@router.get("/space", response_model=ProductSpaceResponse)
+async def get_product_space(
+    filters: ProductFilters = Depends(),
+    max_points: int = Query(2000, ge=10, le=20000),
+):
+    """2-D product-space projection, downsampled server-side for plotting"""
+    snapshot = catalog.get()
+    df = snapshot.df
+    
+    if df.empty:
+        return ProductSpaceResponse(points=[], total=0, sampled=False, version=snapshot.version)
+    
+    coords = product_space(snapshot)
+    mask = filters.mask(df) & ~np.isnan(coords[:, 0])
+    total = int(mask.sum())
+    positions = sample_positions(snapshot, mask, max_points)
+    
+    records = product_records(df.iloc[positions], ["title", "brand", "type_product", "price_numeric"])
+    points = [
+        SpacePoint(x=float(x), y=float(y), price=rec.pop("price_numeric", None), **rec)
+        for (x, y), rec in zip(coords[positions], records)
+    ]
+    return ProductSpaceResponse(points=points, total=total, sampled=len(points) < total, version=snapshot.version)
 
 
 @router.get("/stats", response_model=StatsResponse)
 async def get_stats():
     """Get dashboard statistics"""
-    df = load_data()
+    snapshot = catalog.get()
     
-    if df.empty:
+    if snapshot.df.empty:
         return StatsResponse(
             total_products=0,
             avg_price=0,
@@ -108,52 +307,34 @@ async def get_stats():
             brands=[]
         )
     
-    return StatsResponse(
-        total_products=len(df),
-        avg_price=float(df["price_numeric"].mean()) if "price_numeric" in df else 0,
-        avg_discount=float(df["discount_percentage"].mean()) if "discount_percentage" in df else 0,
-        brands_count=int(df["brand"].nunique()) if "brand" in df else 0,
-        categories=sorted(df["category"].dropna().unique().tolist()) if "category" in df else [],
-        types=sorted(df["type_product"].dropna().unique().tolist()) if "type_product" in df else [],
-        brands=sorted(df["brand"].dropna().unique().tolist()) if "brand" in df else [],
-    )
+    # Aggregates are computed once per dataset version
+    return StatsResponse(**asdict(facets(snapshot)))
 
 
 @router.get("/top-deals", response_model=List[TopDeal])
 async def get_top_deals(limit: int = Query(5, ge=1, le=20)):
     """Get top deals based on deal score"""
-    df = load_data()
+    snapshot = catalog.get()
     
-    if df.empty:
+    if snapshot.df.empty:
         return []
     
-    # Calculate deal score
-    df = df.copy()
-    disc_series = df["discount_percentage"].fillna(0) if "discount_percentage" in df else 0
-    price_series = df["price_numeric"].replace(0, np.nan)
-    brand_score = df["brand"].str.lower().apply(lambda b: 1 if b in TRUSTED_BRANDS else 0) if "brand" in df else 0
-    
-    df["deal_score"] = (
-        disc_series * 0.4 +
-        (1 / price_series).fillna(0) * 10000 * 0.3 +
-        brand_score * 0.3
-    )
-    
-    # Get top deals
-    top = df.nlargest(limit, "deal_score")
+    positions = top_deals(snapshot, limit)
+    scores = deal_scores(snapshot)[positions]
+    top = snapshot.df.iloc[positions]
     
     deals = []
-    for _, row in top.iterrows():
+    for rec, score in zip(product_records(top), scores):
         deals.append(TopDeal(
-            title=row.get("title") if pd.notna(row.get("title")) else None,
-            brand=row.get("brand") if pd.notna(row.get("brand")) else None,
-            price=row.get("price_numeric") if pd.notna(row.get("price_numeric")) else None,
-            old_price=row.get("old_price_numeric") if pd.notna(row.get("old_price_numeric")) else None,
-            discount=row.get("discount_percentage") if pd.notna(row.get("discount_percentage")) else None,
-            image_url=row.get("image_url") if pd.notna(row.get("image_url")) else None,
-            product_link=row.get("product_link") if pd.notna(row.get("product_link")) else None,
-            category=row.get("category") if pd.notna(row.get("category")) else None,
-            deal_score=float(row["deal_score"]),
+            title=rec.get("title"),
+            brand=rec.get("brand"),
+            price=rec.get("price_numeric"),
+            old_price=rec.get("old_price_numeric"),
+            discount=rec.get("discount_percentage"),
+            image_url=rec.get("image_url"),
+            product_link=rec.get("product_link"),
+            category=rec.get("category"),
+            deal_score=float(score),
         ))
     
     return deals
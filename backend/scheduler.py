@@ -1,14 +1,27 @@
 """
 APScheduler configuration for automated scraping
 """
+import asyncio
+import json
+import os
 import sys
+import time
 import subprocess
 import logging
+import threading
 from datetime import datetime
 from pathlib import Path
+from typing import IO, List, Optional
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
+from catalog import catalog
+from events import broker
+from images import catalog_image_urls, image_cache
+from metrics import PIPELINE_ROWS, PIPELINE_STAGE_SECONDS, record_pipeline_output
+from models import ScrapeStatus
+from pipeline import FAILED_PREFIX, STAGE_PREFIX
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,6 +29,24 @@ logger = logging.getLogger(__name__)
 # Project root directory
 PROJECT_ROOT = Path(__file__).parent.parent
 
+# With several API workers only the one holding this lock runs the scheduler;
+# RUN_SCHEDULER=0 keeps a process (or a whole extra instance) out of it altogether
+RUN_SCHEDULER = os.environ.get("RUN_SCHEDULER", "1") != "0"
+SCHEDULER_LOCK = PROJECT_ROOT / ".cache" / "scheduler.lock"
+# Held while a pipeline runs, so a manual trigger in another worker cannot overlap it
+PIPELINE_LOCK = PROJECT_ROOT / ".cache" / "pipeline.lock"
+
+# Status of the last pipeline run, written by whichever worker ran it and read by all
+STATUS_FILE = PROJECT_ROOT / ".cache" / "scrape_status.json"
+# How often each worker looks for changes made by the others (status, new dataset)
+WATCH_SECONDS = 5
+
+# Whole pipeline: scrape (10 min) + clean (2 min) + match (2 min)
+PIPELINE_TIMEOUT = 840
+
+# Status shown to clients while each pipeline stage runs
+STAGE_STATUS = {"scrape": "scraping", "clean": "cleaning", "match": "matching"}
+
 # Scrape status tracking
 scrape_status = {
     "last_scrape": None,
@@ -24,6 +55,131 @@ scrape_status = {
 }
 
 
+def _try_lock(path: Path) -> Optional[IO]:
+    """Non-blocking exclusive lock on ``path``; the open file holds it, None if another process does"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fh = open(path, "a+")
+    try:
+        if os.name == "nt":
+            import msvcrt
+            msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        fh.close()
+        return None
+    return fh
+
+
+def acquire_scheduler_lock() -> Optional[IO]:
+    """Lock that makes this process the one running scheduled scrapes, None if it should not"""
+    if not RUN_SCHEDULER:
+        return None
+    return _try_lock(SCHEDULER_LOCK)
+
+
+def pipeline_busy() -> bool:
+    """Whether a pipeline is running in this or any other worker"""
+    if scrape_status["is_running"]:
+        return True
+    lock = _try_lock(PIPELINE_LOCK)
+    if lock is None:
+        return True
+    lock.close()
+    return False
+
+
+def _write_shared_status():
+    """Save the status for the other workers; atomic, they may read it at any time"""
+    last = scrape_status["last_scrape"]
+    data = {**scrape_status, "last_scrape": last.isoformat() if last else None}
+    STATUS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATUS_FILE.with_name(f"{STATUS_FILE.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, STATUS_FILE)
+
+
+def _update_status(**changes):
+    """Update the scrape status, share it with the other workers and push it to connected clients"""
+    scrape_status.update(changes)
+    _write_shared_status()
+    broker.publish("status", build_scrape_status().model_dump(mode="json"))
+
+
+def _publish_dataset():
+    """Reload the catalog and announce the new dataset version"""
+    previous = catalog.get().version
+    snapshot = catalog.reload()
+    if snapshot.version != previous:
+        broker.publish("dataset", {
+            "version": snapshot.version,
+            "products_count": len(snapshot.df),
+        })
+
+
+def _run_pipeline(timeout: int) -> List[str]:
+    """Run every pipeline stage in one child interpreter, following its progress
+
+    The child announces each stage on stdout (see ``pipeline.py``); the wall
+    time and the stats printed during a stage are recorded under its name.
+    Returns the names of the stages that failed.
+    """
+    proc = subprocess.Popen(
+        [sys.executable, str(PROJECT_ROOT / "pipeline.py")],
+        cwd=str(PROJECT_ROOT),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    timed_out = threading.Event()
+    
+    def kill():
+        timed_out.set()
+        proc.kill()
+    
+    watchdog = threading.Timer(timeout, kill)
+    watchdog.start()
+    
+    stage, output, stage_started = None, [], time.perf_counter()
+    failed = []
+    
+    def finish_stage(failed: bool = False):
+        if stage is None:
+            return
+        PIPELINE_STAGE_SECONDS.observe(time.perf_counter() - stage_started, stage=stage)
+        record_pipeline_output(stage, "\n".join(output))
+        if failed:
+            logger.error(f"Pipeline stage {stage} failed:\n" + "\n".join(output[-30:]))
+        else:
+            logger.info(f"✅ Pipeline stage {stage} complete")
+    
+    try:
+        for line in proc.stdout:
+            line = line.rstrip("\n")
+            if line.startswith(STAGE_PREFIX):
+                finish_stage()
+                stage, output, stage_started = line[len(STAGE_PREFIX):], [], time.perf_counter()
+                _update_status(status=STAGE_STATUS.get(stage, stage))
+            elif line.startswith(FAILED_PREFIX):
+                finish_stage(failed=True)
+                failed.append(line[len(FAILED_PREFIX):] or stage or "pipeline")
+                stage = None
+            else:
+                output.append(line)
+        # a non-zero exit without a FAILED line means the child died mid-stage
+        died = proc.wait() != 0 and not failed
+        finish_stage(failed=died)
+        if died:
+            failed.append(stage or "pipeline")
+    finally:
+        watchdog.cancel()
+    
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(proc.args, timeout)
+    return failed
+
+
 def run_scraping_pipeline():
     """Execute the full scraping and cleaning pipeline"""
     global scrape_status
@@ -31,40 +187,37 @@ def run_scraping_pipeline():
     if scrape_status["is_running"]:
         logger.warning("Scraping already in progress, skipping...")
         return
+    lock = _try_lock(PIPELINE_LOCK)
+    if lock is None:
+        logger.warning("Scraping already in progress in another worker, skipping...")
+        return
+    started = time.perf_counter()
     
-    scrape_status["is_running"] = True
-    scrape_status["status"] = "running"
-    
+    # from here on the lock must be released whatever fails, or no scrape ever runs again
     try:
+        _update_status(is_running=True, status="running")
         logger.info("🚀 Starting automated scraping pipeline...")
         
-        # Run Jumia scraper
-        logger.info("Scraping Jumia...")
-        result = subprocess.run(
-            [sys.executable, str(PROJECT_ROOT / "scraper_jumia_electronics.py")],
-            cwd=str(PROJECT_ROOT),
-            capture_output=True,
-            text=True,
-            timeout=600  # 10 minute timeout
-        )
-        if result.returncode != 0:
-            logger.error(f"Jumia scraper failed: {result.stderr}")
-        else:
-            logger.info("✅ Jumia scraping complete")
+        # Scrape, clean and match in a single interpreter
+        failed = _run_pipeline(timeout=PIPELINE_TIMEOUT)
         
-        # Run data cleaner
-        logger.info("Cleaning data...")
-        result = subprocess.run(
-            [sys.executable, str(PROJECT_ROOT / "clean_jumia_data.py")],
-            cwd=str(PROJECT_ROOT),
-            capture_output=True,
-            text=True,
-            timeout=120
-        )
-        if result.returncode != 0:
-            logger.error(f"Data cleaning failed: {result.stderr}")
-        else:
-            logger.info("✅ Data cleaning complete")
+        # stages that did finish may still have published a new dataset
+        _publish_dataset()
+        if failed:
+            logger.error(f"Pipeline failed at: {', '.join(failed)}")
+            scrape_status["status"] = f"failed: {', '.join(failed)}"
+            return
+        
+        # Warm the image cache now rather than on the first page view
+        logger.info("Prefetching images...")
+        _update_status(status="prefetching images")
+        try:
+            with PIPELINE_STAGE_SECONDS.time(stage="images"):
+                prefetched = image_cache.prefetch(catalog_image_urls())
+            PIPELINE_ROWS.inc(prefetched["fetched"], stage="images")
+            logger.info(f"✅ Image prefetch complete: {prefetched}")
+        except Exception as e:
+            logger.error(f"Image prefetch failed: {e}")
         
         scrape_status["last_scrape"] = datetime.now()
         scrape_status["status"] = "completed"
@@ -77,7 +230,13 @@ def run_scraping_pipeline():
         logger.error(f"Scraping failed: {e}")
         scrape_status["status"] = f"error: {str(e)}"
     finally:
-        scrape_status["is_running"] = False
+        lock.close()
+        PIPELINE_STAGE_SECONDS.observe(time.perf_counter() - started, stage="total")
+        try:
+            _update_status(is_running=False)
+        except Exception as e:
+            scrape_status["is_running"] = False
+            logger.error(f"Could not publish the final scrape status: {e}")
 
 
 def create_scheduler(interval_hours: int = 6) -> BackgroundScheduler:
@@ -98,5 +257,57 @@ def create_scheduler(interval_hours: int = 6) -> BackgroundScheduler:
 
 
 def get_scrape_status() -> dict:
-    """Get current scrape status"""
-    return scrape_status.copy()
+    """Get current scrape status, as last shared by whichever worker ran a pipeline"""
+    status = scrape_status.copy()
+    if scrape_status["is_running"]:
+        return status
+    try:
+        shared = json.loads(STATUS_FILE.read_text())
+    except (FileNotFoundError, ValueError):
+        return status
+    if shared.get("last_scrape"):
+        shared["last_scrape"] = datetime.fromisoformat(shared["last_scrape"])
+    status.update(shared)
+    # another worker's "running" only holds while it still has the pipeline lock
+    if status["is_running"] and not pipeline_busy():
+        status.update(is_running=False, status="interrupted")
+    return status
+
+
+def build_scrape_status() -> ScrapeStatus:
+    """Combine the scrape status with the loaded catalog's size and version"""
+    status = get_scrape_status()
+    snapshot = catalog.get()
+    return ScrapeStatus(
+        last_scrape=status.get("last_scrape"),
+        status=status.get("status", "unknown"),
+        products_count=len(snapshot.df),
+        is_running=status.get("is_running", False),
+        data_version=snapshot.version,
+    )
+
+
+async def watch_shared_state():
+    """Push what other workers changed to this worker's clients
+
+    Events are published in the process that runs the pipeline; every other
+    worker notices the new dataset (catalog fingerprint) and the shared status
+    file here and broadcasts them to its own subscribers.
+    """
+    last_status = None
+    while True:
+        await asyncio.sleep(WATCH_SECONDS)
+        try:
+            before = catalog.loaded_version
+            snapshot = await asyncio.to_thread(catalog.get)
+            if snapshot.version != before:
+                broker.publish("dataset", {
+                    "version": snapshot.version,
+                    "products_count": len(snapshot.df),
+                })
+            status = (await asyncio.to_thread(build_scrape_status)).model_dump(mode="json")
+            if last_status is not None and status != last_status:
+                broker.publish("status", status)
+            last_status = status
+        except Exception as e:
+            logger.warning(f"Checking for changes from other workers failed: {e}")
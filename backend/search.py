@@ -0,0 +1,159 @@
+"""
+Natural-language product search for the chat assistant
+"""
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from catalog import CatalogSnapshot
+
+TOKEN_RE = re.compile(r"\w+")
+
+UNDER_RE = re.compile(r"(?:under|below|less than)\s+(\d+)")
+ABOVE_RE = re.compile(r"(?:above|over|more than)\s+(\d+)")
+
+DISCOUNT_WORDS = {"discount", "discounts", "sale", "sales", "deal", "deals", "promo"}
+CHEAP_WORDS = {"cheap", "cheapest", "budget", "affordable"}
+BEST_WORDS = {"best", "top"}
+
+# Words that carry no product meaning once the intents above are extracted
+STOPWORDS = {
+    "the", "and", "for", "with", "show", "find", "get", "good", "me", "some",
+    "any", "what", "which", "are", "is", "dhs", "mad", "price", "prices",
+    "product", "products", "of", "in", "on", "to", "my", "an", "or", "at",
+    "how", "much", "average", "biggest", "most", "has", "have",
+} | DISCOUNT_WORDS | CHEAP_WORDS | BEST_WORDS
+
+# Keywords this long also match inside tokens ("phone" finds "smartphone");
+# shorter ones ("tv", "hp", "pc") only as a prefix, or they would match noise
+MIN_INFIX_LEN = 3
+
+# Minimum discount (%) for "deal" and "best" queries
+DEAL_MIN_DISCOUNT = 20
+BEST_MIN_DISCOUNT = 15
+
+
+@dataclass(frozen=True)
+class ParsedQuery:
+    """Intents extracted from a chat message"""
+    keywords: Tuple[str, ...] = ()
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    wants_discount: bool = False
+    wants_cheap: bool = False
+    wants_best: bool = False
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@lru_cache(maxsize=2048)
+def parse_query(text: str) -> ParsedQuery:
+    """Parse price bounds, intents and keywords; results are cached per query"""
+    q = text.lower().strip()
+    under = UNDER_RE.search(q)
+    above = ABOVE_RE.search(q)
+    rest = ABOVE_RE.sub(" ", UNDER_RE.sub(" ", q))
+    words = set(TOKEN_RE.findall(q))
+    keywords = tuple(dict.fromkeys(
+        _stem(w) for w in TOKEN_RE.findall(rest)
+        if len(w) > 1 and w not in STOPWORDS and not w.isdigit()
+    ))
+    return ParsedQuery(
+        keywords=keywords,
+        min_price=float(above.group(1)) if above else None,
+        max_price=float(under.group(1)) if under else None,
+        wants_discount=bool(words & DISCOUNT_WORDS),
+        wants_cheap=bool(words & CHEAP_WORDS),
+        wants_best=bool(words & BEST_WORDS),
+    )
+
+
+def _stem(word: str) -> str:
+    # "phones" should find "phone"; prefix matching covers the plural again
+    return word[:-1] if len(word) >= 3 and word.endswith("s") else word
+
+
+class SearchIndex:
+    """Inverted token index over title, brand, category and type"""
+
+    def __init__(self, df: pd.DataFrame):
+        text = df["title"].fillna("").astype(str)
+        for col in ("brand", "category", "type_product"):
+            if col in df:
+                text = text + " " + df[col].astype(object).fillna("").astype(str)
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for pos, doc in enumerate(text.str.lower()):
+            for token in set(TOKEN_RE.findall(doc)):
+                postings[token].append(pos)
+
+        self.size = len(df)
+        self.vocab = sorted(postings)
+        # category slugs ("telephone_tablette") contain everything in the category:
+        # they only match by prefix, or "phone" would return every sticker in it
+        slugs = set()
+        if "category" in df:
+            for value in df["category"].dropna().astype(str).unique():
+                slugs.update(TOKEN_RE.findall(value.lower()))
+        self.infix_vocab = [t for t in self.vocab if t not in slugs]
+        self.postings = {t: np.asarray(rows, dtype=np.int32) for t, rows in postings.items()}
+        self.price = df["price_numeric"].fillna(0).to_numpy()
+        self.discount = df["discount_percentage"].fillna(0).to_numpy()
+        # the vocabulary scan for infix matches is the costly part: once per keyword
+        self.match = lru_cache(maxsize=1024)(self._match)
+
+    def _match(self, keyword: str) -> np.ndarray:
+        """Rows containing a token that starts with ``keyword``, or contains it if long enough"""
+        hits = []
+        i = bisect_left(self.vocab, keyword)
+        while i < len(self.vocab) and self.vocab[i].startswith(keyword):
+            hits.append(self.postings[self.vocab[i]])
+            i += 1
+        if len(keyword) >= MIN_INFIX_LEN:
+            hits.extend(self.postings[t] for t in self.infix_vocab if keyword in t and not t.startswith(keyword))
+        if not hits:
+            return np.array([], dtype=np.int32)
+        return np.unique(np.concatenate(hits))
+
+
+def get_index(snapshot: CatalogSnapshot) -> SearchIndex:
+    return snapshot.derived("search_index", SearchIndex)
+
+
+def search(snapshot: CatalogSnapshot, parsed: ParsedQuery, limit: int = 8) -> Tuple[np.ndarray, int]:
+    """Return the positions of the best ``limit`` rows and the total match count"""
+    index = get_index(snapshot)
+    mask = np.ones(index.size, dtype=bool)
+
+    if parsed.max_price is not None:
+        mask &= index.price <= parsed.max_price
+    if parsed.min_price is not None:
+        mask &= index.price >= parsed.min_price
+    if parsed.wants_discount:
+        mask &= index.discount > DEAL_MIN_DISCOUNT
+    if parsed.wants_best:
+        mask &= index.discount > BEST_MIN_DISCOUNT
+
+    # Rank by how many keywords a product matches; any match qualifies
+    matched = np.zeros(index.size, dtype=np.int16)
+    for keyword in parsed.keywords:
+        matched[index.match(keyword)] += 1
+    if parsed.keywords:
+        mask &= matched > 0
+
+    positions = np.flatnonzero(mask)
+    if parsed.wants_cheap:
+        secondary = index.price[positions]
+    elif parsed.wants_discount or parsed.wants_best:
+        secondary = -index.discount[positions]
+    else:
+        secondary = np.zeros(len(positions))
+    order = np.lexsort((positions, secondary, -matched[positions]))
+    return positions[order[:limit]], len(positions)
@@ -0,0 +1,123 @@
+"""
+Per-version aggregates shared by the API and the Streamlit dashboard
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from catalog import CatalogSnapshot
+from product_space import COORD_COLS, project
+
+# Trusted brands for deal scoring
+TRUSTED_BRANDS = {"samsung", "xiaomi", "apple", "lg", "sony", "dell", "hp", "lenovo", "huawei", "asus"}
+
+
+@dataclass(frozen=True)
+class Facets:
+    total_products: int
+    avg_price: float
+    avg_discount: float
+    brands_count: int
+    categories: List[str]
+    types: List[str]
+    brands: List[str]
+
+
+def _unique(df: pd.DataFrame, col: str) -> List[str]:
+    return sorted(df[col].dropna().unique().tolist()) if col in df else []
+
+
+def _mean(df: pd.DataFrame, col: str) -> float:
+    return float(df[col].astype(np.float64).mean()) if col in df and len(df) else 0.0
+
+
+def facets(snapshot: CatalogSnapshot) -> Facets:
+    """Dashboard statistics and filter choices"""
+    def build(df: pd.DataFrame) -> Facets:
+        return Facets(
+            total_products=len(df),
+            avg_price=_mean(df, "price_numeric"),
+            avg_discount=_mean(df, "discount_percentage"),
+            brands_count=int(df["brand"].nunique()) if "brand" in df else 0,
+            categories=_unique(df, "category"),
+            types=_unique(df, "type_product"),
+            brands=_unique(df, "brand"),
+        )
+    return snapshot.derived("facets", build)
+
+
+def isin_lower(col: pd.Series, values) -> np.ndarray:
+    """Case-insensitive ``isin``, evaluated once per category and then on the codes"""
+    if not isinstance(col.dtype, pd.CategoricalDtype):
+        col = col.astype("category")
+    hit = col.cat.categories.str.lower().isin([v.lower() for v in values])
+    return np.append(hit, False)[col.cat.codes.to_numpy()]  # code -1 is NaN
+
+
+def deal_score(df: pd.DataFrame) -> pd.Series:
+    """Score favouring big discounts, low prices and trusted brands"""
+    # scored in float64 so rankings do not depend on the compact float32 storage
+    disc_series = df["discount_percentage"].astype(np.float64).fillna(0) if "discount_percentage" in df else 0
+    price_series = df["price_numeric"].astype(np.float64).replace(0, np.nan)
+    brand_score = isin_lower(df["brand"], TRUSTED_BRANDS).astype(int) if "brand" in df else 0
+    return (
+        disc_series * 0.4 +
+        (1 / price_series).fillna(0) * 10000 * 0.3 +
+        brand_score * 0.3
+    )
+
+
+def deal_scores(snapshot: CatalogSnapshot) -> np.ndarray:
+    return snapshot.derived("deal_score", lambda df: deal_score(df).to_numpy(dtype=float))
+
+
+def deal_order(snapshot: CatalogSnapshot) -> np.ndarray:
+    """Row positions from best to worst deal"""
+    return snapshot.derived("deal_order", lambda _: np.argsort(-deal_scores(snapshot), kind="stable"))
+
+
+def top_deals(snapshot: CatalogSnapshot, limit: int, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """Positions of the best ``limit`` deals, optionally within ``mask``"""
+    order = deal_order(snapshot)
+    if mask is not None:
+        order = order[mask[order]]
+    return order[:limit]
+
+
+def filter_mask(
+    snapshot: CatalogSnapshot,
+    categories: Sequence[str] = (),
+    brands: Sequence[str] = (),
+    types: Sequence[str] = (),
+    price_range: Optional[Tuple[float, float]] = None,
+) -> np.ndarray:
+    """Multi-select filters as used by the dashboard sidebar; empty means no filter"""
+    df = snapshot.df
+    mask = np.ones(len(df), dtype=bool)
+    for col, values in (("category", categories), ("brand", brands), ("type_product", types)):
+        if values and col in df:
+            mask &= df[col].isin(values).to_numpy()
+    if price_range and "price_numeric" in df:
+        mask &= df["price_numeric"].between(*price_range).to_numpy()
+    return mask
+
+
+def product_space(snapshot: CatalogSnapshot) -> np.ndarray:
+    """(n, 2) product-space coordinates, NaN where unavailable.
+
+    Read from the cleaned CSV when the pipeline wrote them; older datasets
+    are projected once on first use.
+    """
+    def build(df: pd.DataFrame) -> np.ndarray:
+        coords = df[COORD_COLS] if set(COORD_COLS) <= set(df.columns) else project(df)
+        return coords.to_numpy(dtype=np.float32)
+    return snapshot.derived("product_space", build)
+
+
+def sample_positions(snapshot: CatalogSnapshot, mask: np.ndarray, max_points: int) -> np.ndarray:
+    """Deterministic random sample of at most ``max_points`` rows within ``mask``"""
+    perm = snapshot.derived("sample_order", lambda df: np.random.default_rng(0).permutation(len(df)))
+    picked = perm[mask[perm]][:max_points]
+    return np.sort(picked)
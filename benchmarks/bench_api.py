@@ -0,0 +1,189 @@
+"""
+Latency of the product API on synthetic catalogs of 10k, 100k and 1M rows.
+
+    python benchmarks/bench_api.py [--sizes 10k,100k] [--repeat 30] [--out FILE]
+    python benchmarks/bench_api.py --server [--workers 1] [--concurrency 16] [--requests 400]
+
+The default mode calls the FastAPI app in process, which isolates the handler
+cost: for each case it records the first request (per-version caches cold)
+and the latency of the following ones. ``--server`` starts a local uvicorn on
+the synthetic catalog (``CATALOG_CSV``) and load-tests it over HTTP with
+concurrent clients, reporting throughput and tail latency.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from common import ROOT, parse_sizes, summarize, timed, write_report  # noqa: E402
+from synth import catalog_csv  # noqa: E402
+
+import httpx  # noqa: E402
+
+
+def cases(n: int) -> dict:
+    """Named request paths; the deep page sits near the end of the catalog"""
+    return {
+        "list": "/api/products",
+        "list_filter": "/api/products?category=gaming&min_price=200&max_price=5000",
+        "list_brand_type": "/api/products?brand=Samsung&type_product=smartphone",
+        "list_search": "/api/products?search=galaxy",
+        "list_sort_price": "/api/products?sort_by=price&sort_order=desc",
+        "list_sort_title": "/api/products?sort_by=title",
+        "list_filter_sort": "/api/products?category=informatique&sort_by=discount&sort_order=desc&per_page=50",
+        "list_deep_page": f"/api/products?per_page=100&page={max(n // 100 - 1, 1)}",
+        "list_per_page_1000": "/api/products?per_page=1000",
+        "stats": "/api/products/stats",
+        "top_deals": "/api/products/top-deals?limit=20",
+    }
+
+
+def cursor_walk(client, pages: int = 10) -> None:
+    """Follow ``next_cursor`` through a sorted listing"""
+    url = "/api/products?sort_by=price&per_page=50"
+    body = client.get(url).json()
+    for _ in range(pages - 1):
+        if not body.get("next_cursor"):
+            break
+        body = client.get(f"{url}&cursor={body['next_cursor']}").json()
+
+
+# --- in process -----------------------------------------------------------------
+
+def bench_in_process(sizes: list, repeat: int) -> dict:
+    from fastapi.testclient import TestClient
+
+    from arrow_store import ArrowStore
+    from catalog import PROJECT_ROOT, catalog
+    from main import app
+
+    client = TestClient(app)  # no lifespan: the scheduler stays off
+    results = {}
+    for n in sizes:
+        path = catalog_csv(n)
+        catalog.path = path
+        catalog.store = ArrowStore(PROJECT_ROOT / ".cache" / "catalog" / path.stem)
+
+        start = time.perf_counter()
+        catalog.reload()
+        size = {"load_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+        for name, url in cases(n).items():
+            start = time.perf_counter()
+            response = client.get(url)
+            first = (time.perf_counter() - start) * 1000
+            response.raise_for_status()
+            size[name] = {"first_ms": round(first, 3), **timed(lambda: client.get(url), repeat, warmup=0)}
+        size["cursor_walk_10"] = timed(lambda: cursor_walk(client), max(repeat // 5, 3))
+        results[str(n)] = size
+    return results
+
+
+# --- against a local uvicorn -------------------------------------------------------
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(csv: Optional[Path], workers: int = 1) -> tuple:
+    """Start uvicorn on ``csv`` (the bundled catalog if None) and wait until it reports ready"""
+    port = _free_port()
+    env = {**os.environ, "CATALOG_CSV": str(csv)} if csv else dict(os.environ)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT / "backend",
+        env=env,
+        stdout=subprocess.DEVNULL,  # keep the JSON report on stdout clean
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with {proc.returncode}")
+        try:
+            if httpx.get(base + "/api/ready", timeout=1).status_code == 200:
+                return proc, base
+        except httpx.TransportError:
+            pass
+        time.sleep(0.05)
+    proc.terminate()
+    raise RuntimeError("uvicorn did not come up within 120s")
+
+
+async def load_test(base: str, url: str, concurrency: int, requests: int) -> dict:
+    latencies, errors = [], 0
+    queue = iter(range(requests))
+
+    async def worker(client):
+        nonlocal errors
+        for _ in queue:
+            start = time.perf_counter()
+            try:
+                response = await client.get(url)
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.TransportError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=60) as client:
+        await client.get(url)  # load the catalog and fill the per-version caches
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        wall = time.perf_counter() - start
+
+    stats = summarize(latencies)
+    stats["p99_ms"] = round(sorted(latencies)[int(len(latencies) * 0.99) - 1] * 1000, 3)
+    return {**stats, "errors": errors, "requests_per_sec": round(len(latencies) / wall, 1)}
+
+
+def bench_server(sizes: list, workers: int, concurrency: int, requests: int) -> dict:
+    results = {}
+    for n in sizes:
+        proc, base = start_server(catalog_csv(n), workers)
+        try:
+            results[str(n)] = {
+                name: asyncio.run(load_test(base, url, concurrency, requests))
+                for name, url in cases(n).items()
+            }
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10k,100k", help="catalog rows, e.g. 10k,100k,1m")
+    parser.add_argument("--repeat", type=int, default=30, help="timed in-process requests per case")
+    parser.add_argument("--server", action="store_true", help="load-test a local uvicorn instead")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes (--server)")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients (--server)")
+    parser.add_argument("--requests", type=int, default=400, help="requests per case (--server)")
+    parser.add_argument("--out", help="JSON result file (default benchmarks/results/<api|api-server>-<commit>.json)")
+    args = parser.parse_args()
+
+    sizes = parse_sizes(args.sizes)
+    if args.server:
+        results = bench_server(sizes, args.workers, args.concurrency, args.requests)
+        results["settings"] = {"workers": args.workers, "concurrency": args.concurrency, "requests": args.requests}
+        write_report("api-server", results, args.out)
+    else:
+        write_report("api", bench_in_process(sizes, args.repeat), args.out)
+
+
+if __name__ == "__main__":
+    main()
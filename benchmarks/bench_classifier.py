@@ -0,0 +1,114 @@
+"""
+Accuracy and throughput of the product-type classifier.
+
+    python benchmarks/bench_classifier.py [--repeat 20]
+
+Accuracy is measured on ``benchmarks/data/type_labels.csv`` (120 hand-labelled
+titles sampled from ``jumia_raw.csv``; an empty label means "no type").
+Throughput runs over every title of ``jumia_raw.csv`` and compares the old
+per-pattern regex loop with the compiled classifier, then measures how extra
+rules affect the compiled matcher.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import string
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from type_classifier import TypeClassifier, load_rules  # noqa: E402
+
+LABELS_CSV = Path(__file__).with_name("data") / "type_labels.csv"
+RAW_CSV = ROOT / "jumia_raw.csv"
+
+# classify_type as it was before the rules moved to product_types.json
+LEGACY_PATTERNS = {
+    "smartphone": r"\b(?:smartphone|phone|galaxy|iphone)\b",
+    "laptop": r"\blaptop|notebook|macbook|ideapad|thinkpad|inspiron\b",
+    "tablet": r"\btablet|ipad|tab\b",
+    "tv": r"\b(?:televis(?:ion)?|smart\s*tv|led\s*tv|uhd\s*tv)\b",
+    "earpods": r"\b(?:earpods?|earbuds?|airpods?)\b",
+    "smartwatch": r"\bwatch\b",
+    "remote": r"\bremote\b",
+    "console": r"\b(?:playstation|ps5|xbox|nintendo|switch)\b",
+}
+
+
+def legacy_classify(title):
+    if not title or not isinstance(title, str):
+        return None
+    low = title.lower()
+    for t, pat in LEGACY_PATTERNS.items():
+        if re.search(pat, low):
+            return t
+    return None
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def padded_rules(extra_types: int, keywords_per_type: int = 10) -> list:
+    """The shipped rules plus ``extra_types`` made-up types that never match"""
+    rng = random.Random(0)
+    rules = load_rules()
+    for i in range(extra_types):
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 10))) for _ in range(keywords_per_type)]
+        rules.append({"type": f"synthetic_{i}", "keywords": words})
+    return rules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20, help="timing runs, best one is reported")
+    args = parser.parse_args()
+
+    clf = TypeClassifier(load_rules())
+
+    labels = pd.read_csv(LABELS_CSV, keep_default_na=False)
+    gold = labels["type_product"]
+    accuracy = {
+        "legacy": float((labels["title"].map(legacy_classify).fillna("") == gold).mean()),
+        "compiled": float((clf.classify_series(labels["title"]).fillna("") == gold).mean()),
+    }
+
+    titles = pd.read_csv(RAW_CSV)["title"]
+    n = len(titles)
+    seconds = {
+        "legacy_apply": best_of(lambda: titles.apply(legacy_classify), args.repeat),
+        "compiled_apply": best_of(lambda: titles.apply(clf.classify), args.repeat),
+        "compiled_series": best_of(lambda: clf.classify_series(titles), args.repeat),
+    }
+
+    scaling = {}
+    for extra in (0, 50, 200):
+        padded = TypeClassifier(padded_rules(extra))
+        scaling[len(padded_rules(extra))] = round(n / best_of(lambda: titles.apply(padded.classify), args.repeat))
+
+    report = {
+        "labelled_titles": len(labels),
+        "accuracy": {k: round(v, 3) for k, v in accuracy.items()},
+        "titles": n,
+        "titles_per_sec": {k: round(n / v) for k, v in seconds.items()},
+        "compiled_titles_per_sec_by_rule_count": scaling,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Throughput of the scraping pipeline hot paths: ``parse_listing`` and ``clean()``.
+
+    python benchmarks/bench_pipeline.py [--sizes 10k,100k] [--repeat 3] [--recording DIR] [--out FILE]
+
+``parse_listing`` runs on the synthetic page ``benchmarks/data/jumia_listing_synthetic.html``
+(real rows in generated markup, see ``synth.py``: not a saved Jumia page);
+``clean()`` runs end to end (CSV in, CSV out) on synthetic raw scrapes of each
+size, in a temporary directory so the real data files are left alone.
+
+``--recording`` also parses every Jumia page of a run saved with
+``FETCH_MODE=record FETCH_DIR=DIR`` (see ``fetch.py``), offline: the numbers
+to trust for real markup.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from common import parse_sizes, timed, write_report  # noqa: E402
+from synth import LISTING_HTML, raw_csv  # noqa: E402
+
+import clean_jumia_data  # noqa: E402
+from fetch import PageStore  # noqa: E402
+from scraper_jumia_electronics import CATEGORIES, parse_listing  # noqa: E402
+
+LISTING_URL = "https://www.jumia.ma/telephone-tablette/?page=1#catalog-listing"
+
+
+def bench_parse_listing(repeat: int) -> dict:
+    page = LISTING_HTML.read_text(encoding="utf-8")
+    rows = len(parse_listing(page, LISTING_URL, "telephone_tablette"))
+    stats = timed(lambda: parse_listing(page, LISTING_URL, "telephone_tablette"), repeat)
+    return {
+        "page_bytes": len(page.encode()),
+        "rows_per_page": rows,
+        **stats,
+        "pages_per_sec": round(1000 / stats["p50_ms"], 1),
+        "rows_per_sec": round(rows * 1000 / stats["p50_ms"]),
+    }
+
+
+def bench_recording(root: Path, repeat: int) -> dict:
+    pages = []
+    for page in PageStore(root):
+        cat_key = next((k for k, base in CATEGORIES.items() if page.url.startswith(base)), None)
+        if cat_key and page.status == 200:
+            pages.append((page.text, page.url, cat_key))
+    if not pages:
+        raise SystemExit(f"No recorded Jumia pages under {root}")
+
+    rows = sum(len(parse_listing(*args)) for args in pages)
+    stats = timed(lambda: [parse_listing(*args) for args in pages], repeat)
+    return {
+        "pages": len(pages),
+        "rows": rows,
+        **stats,
+        "pages_per_sec": round(len(pages) * 1000 / stats["p50_ms"], 1),
+        "rows_per_sec": round(rows * 1000 / stats["p50_ms"]),
+    }
+
+
+def bench_clean(n: int, repeat: int) -> dict:
+    source = raw_csv(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        clean_jumia_data.RAW_CSV = source
+        clean_jumia_data.CLEAN_CSV = Path(tmp) / "jumia_products_clean.csv"
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = timed(clean_jumia_data.clean, repeat, warmup=0)
+    return {**stats, "rows_per_sec": round(n * 1000 / stats["p50_ms"])}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10k,100k", help="raw rows for clean(), e.g. 10k,100k,1m")
+    parser.add_argument("--repeat", type=int, default=3, help="timed clean() runs per size")
+    parser.add_argument("--parse-repeat", type=int, default=50, help="timed parse_listing runs")
+    parser.add_argument("--recording", type=Path, help="FETCH_DIR of a recorded scrape to parse as well")
+    parser.add_argument("--out", help="JSON result file (default benchmarks/results/pipeline-<commit>.json)")
+    args = parser.parse_args()
+
+    results = {"parse_listing": bench_parse_listing(args.parse_repeat)}
+    if args.recording:
+        results["parse_recording"] = bench_recording(args.recording, args.repeat)
+    for n in parse_sizes(args.sizes):
+        results[f"clean[{n}]"] = bench_clean(n, args.repeat)
+    write_report("pipeline", results, args.out)
+
+
+if __name__ == "__main__":
+    main()
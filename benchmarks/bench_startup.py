@@ -0,0 +1,86 @@
+"""
+Cold-start cost of the API: module import time and time until ready.
+
+    python benchmarks/bench_startup.py [--repeat 5] [--size 100k] [--out FILE]
+
+Each run uses a fresh interpreter. ``import`` times ``import main`` alone;
+``ready`` starts uvicorn and polls ``/api/ready`` (the catalog is preloaded
+in the lifespan hook, so this includes loading the dataset), then times the
+first ``/api/products`` request. ``--size`` serves a synthetic catalog instead
+of the bundled one. The first start may also build the shared Arrow snapshot;
+it is reported apart from the later ones.
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from common import ROOT, parse_sizes, summarize, write_report  # noqa: E402
+from bench_api import start_server  # noqa: E402
+from synth import catalog_csv  # noqa: E402
+
+import httpx  # noqa: E402
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+# Modules the API should not load until something needs them
+DEFERRED = ("sklearn", "scipy", "requests", "bs4")
+
+
+def import_seconds() -> float:
+    out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT / "backend", capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def loaded_heavy_modules() -> list:
+    """Which of ``DEFERRED`` got imported anyway by ``import main``"""
+    code = f"import sys, main; print(','.join(m for m in {DEFERRED!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT / "backend", capture_output=True, text=True, check=True)
+    return [m for m in out.stdout.strip().split(",") if m]
+
+
+def start_once(csv) -> dict:
+    start = time.perf_counter()
+    proc, base = start_server(csv)
+    try:
+        ready = time.perf_counter() - start
+        startup = httpx.get(base + "/api/ready").json()
+        t = time.perf_counter()
+        httpx.get(base + "/api/products", timeout=60).raise_for_status()
+        first = time.perf_counter() - t
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return {"ready": ready, "first_request": first, "preload": startup.get("preload_seconds") or 0.0}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--size", help="serve a synthetic catalog of this many rows, e.g. 100k")
+    parser.add_argument("--out", help="JSON result file (default benchmarks/results/startup-<commit>.json)")
+    args = parser.parse_args()
+
+    csv = catalog_csv(parse_sizes(args.size)[0]) if args.size else None
+    imports = [import_seconds() for _ in range(args.repeat)]
+    starts = [start_once(csv) for _ in range(args.repeat + 1)]
+    first, warm = starts[0], starts[1:]
+
+    results = {
+        "dataset": csv.name if csv else "jumia_products_clean.csv",
+        "import_main": summarize(imports),
+        "heavy_modules_at_import": loaded_heavy_modules(),
+        "first_start": {k: round(v * 1000, 1) for k, v in first.items()},
+        **{f"{k}": summarize([s[k] for s in warm]) for k in ("ready", "preload", "first_request")},
+    }
+    write_report("startup", results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Shared helpers for the benchmark scripts: timing, run metadata and JSON output.
+
+Every script writes one JSON report (stdout and ``--out``, by default
+``benchmarks/results/<script>-<commit>.json``) so two commits can be compared
+with ``benchmarks/compare.py``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).with_name("results")
+
+# Pipeline modules live in the project root, API modules in backend/ (see backend/main.py)
+for path in (ROOT, ROOT / "backend"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+def summarize(seconds: list) -> dict:
+    """Latency percentiles in milliseconds"""
+    ms = np.asarray(seconds) * 1000
+    return {
+        "runs": len(ms),
+        "min_ms": round(float(ms.min()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+    }
+
+
+def timed(fn: Callable[[], object], repeat: int, warmup: int = 1) -> dict:
+    """Run ``fn`` ``warmup`` times untimed, then ``repeat`` times timed"""
+    for _ in range(warmup):
+        fn()
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - start)
+    return summarize(seconds)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+
+
+def environment() -> dict:
+    """What a result depends on besides the code"""
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_report(name: str, results: dict, out: Optional[str] = None) -> Path:
+    """Print the report and save it for later comparison"""
+    report = {"benchmark": name, "environment": environment(), "results": results}
+    path = Path(out) if out else RESULTS_DIR / f"{name}-{report['environment']['commit'] or 'unknown'}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(json.dumps(report, indent=2))
+    print(f"saved {path}", file=sys.stderr)
+    return path
+
+
+def parse_sizes(text: str) -> list:
+    """``"10k,100k,1m"`` -> ``[10000, 100000, 1000000]``"""
+    units = {"k": 1_000, "m": 1_000_000}
+    sizes = []
+    for part in text.lower().split(","):
+        part = part.strip()
+        sizes.append(int(float(part[:-1]) * units[part[-1]]) if part[-1] in units else int(part))
+    return sizes
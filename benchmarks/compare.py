@@ -0,0 +1,62 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+    python benchmarks/compare.py OLD.json NEW.json [--metric p50_ms] [--threshold 10]
+
+Latency metrics (``*_ms``) regress when they grow, throughput metrics
+(``*_per_sec``) when they shrink. Exits with status 1 when any case moved the
+wrong way by more than ``--threshold`` percent, so it can gate a CI job.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    """``{"10000": {"list": {"p50_ms": 1.2}}}`` -> ``{"10000/list/p50_ms": 1.2}``"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}/{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("old", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument("--metric", default="p50_ms,rows_per_sec,requests_per_sec", help="comma separated metric names to compare")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change that counts as a regression")
+    args = parser.parse_args()
+
+    old, new = (json.loads(p.read_text(encoding="utf-8")) for p in (args.old, args.new))
+    before, after = flatten(old["results"]), flatten(new["results"])
+    metrics = set(args.metric.split(","))
+
+    print(f"{old['environment']['commit']} -> {new['environment']['commit']}")
+    regressions = 0
+    for name in sorted(before.keys() & after.keys()):
+        if name.rsplit("/", 1)[-1] not in metrics or not before[name]:
+            continue
+        change = (after[name] - before[name]) / before[name] * 100
+        worse = change if name.endswith("_ms") else -change
+        flag = ""
+        if worse > args.threshold:
+            flag, regressions = "  REGRESSION", regressions + 1
+        elif worse < -args.threshold:
+            flag = "  faster"
+        print(f"{name:60} {before[name]:>12g} {after[name]:>12g} {change:+7.1f}%{flag}")
+
+    print(f"{regressions} regression(s) over {args.threshold:g}%")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Synthetic datasets for the benchmarks, shaped like the real pipeline files.
+
+    python benchmarks/synth.py --sizes 10k,100k,1m     # pre-generate catalogs
+    python benchmarks/synth.py --listing               # rewrite the synthetic HTML fixture
+
+Rows are resampled from the bundled ``jumia_raw.csv`` / ``jumia_products_clean.csv``
+with a fixed seed, so brands, types, categories and price spread follow the
+real data. Titles get a model code drawn from a bounded pool (the search
+vocabulary grows like a real catalog's, not with the row count), prices are
+jittered and every product link and image URL is unique. Generated CSVs are
+cached under ``benchmarks/data/synthetic/`` (not committed).
+
+The listing page fixture is synthetic too: real rows from ``jumia_raw.csv``
+rendered into Jumia's product-card markup, wrapped in made-up navigation,
+filters and a filler ``window.__STORE__`` script to give it page-like size. It
+is not a saved Jumia page, so ``parse_listing`` timings on it only compare
+parser versions with each other; record a real run with ``fetch.py`` for
+numbers on live markup.
+"""
+
+from __future__ import annotations
+
+import argparse
+import html
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from common import ROOT, parse_sizes  # noqa: E402
+
+DATA_DIR = Path(__file__).with_name("data")
+SYNTHETIC_DIR = DATA_DIR / "synthetic"
+LISTING_HTML = DATA_DIR / "jumia_listing_synthetic.html"
+
+RAW_CSV = ROOT / "jumia_raw.csv"
+CLEAN_CSV = ROOT / "jumia_products_clean.csv"
+
+SEED = 7
+MODEL_CODES = 5000
+PRICE_JITTER = 0.15  # sigma of the lognormal price factor
+
+IMAGE_PREFIX = "https://ma.jumia.is/unsafe/fit-in/300x300/filters:fill(white)/product/"
+
+
+def _size_label(n: int) -> str:
+    for unit, div in (("m", 1_000_000), ("k", 1_000)):
+        if n % div == 0:
+            return f"{n // div}{unit}"
+    return str(n)
+
+
+def _resample(source: pd.DataFrame, n: int, rng: np.random.Generator) -> pd.DataFrame:
+    df = source.iloc[rng.integers(0, len(source), n)].reset_index(drop=True)
+    codes = pd.Series([f"{a}{b}" for a, b in zip(rng.choice(list("ABCKMSTXZ"), MODEL_CODES), rng.integers(10, 999, MODEL_CODES))])
+    df["title"] = df["title"] + " - " + codes.iloc[rng.integers(0, MODEL_CODES, n)].to_numpy()
+
+    sku = pd.Series(np.arange(n) + 10_000_000, dtype=str)
+    slug = df["product_link"].str.replace(r"-\d+\.html$", "", regex=True)
+    df["product_link"] = slug + "-" + sku + ".html"
+    df["image_url"] = IMAGE_PREFIX + sku.str[-2:] + "/" + sku + "/1.jpg?" + pd.Series(rng.integers(1000, 9999, n), dtype=str)
+    return df
+
+
+def synth_clean(n: int, seed: int = SEED) -> pd.DataFrame:
+    """``n`` rows with the columns ``clean_jumia_data.clean()`` writes"""
+    rng = np.random.default_rng(seed)
+    df = _resample(pd.read_csv(CLEAN_CSV), n, rng)
+    factor = rng.lognormal(0, PRICE_JITTER, n)
+    df["price_numeric"] = (df["price_numeric"] * factor).round()
+    df["old_price_numeric"] = (df["old_price_numeric"] * factor).round()
+    discount = ((1 - df["price_numeric"] / df["old_price_numeric"]) * 100).round(1)
+    df["discount_percentage"] = discount.where(discount >= 0)
+    df["pca_x"] = rng.normal(0, 1.5, n).round(4)
+    df["pca_y"] = rng.normal(0, 1.0, n).round(4)
+    return df
+
+
+def synth_raw(n: int, seed: int = SEED) -> pd.DataFrame:
+    """``n`` rows with the columns the scraper writes to ``jumia_raw.csv``"""
+    rng = np.random.default_rng(seed)
+    df = _resample(pd.read_csv(RAW_CSV), n, rng)
+    factor = rng.lognormal(0, PRICE_JITTER, n)
+    for col in ("price_txt", "old_price_txt"):
+        # a few listings show a price range; keep its lower bound
+        price = df[col].str.extract(r"([\d,]+(?:\.\d+)?)")[0].str.replace(",", "").astype(float) * factor
+        df[col] = price.round().map("{:,.2f} Dhs".format, na_action="ignore")
+    df["brand_guess"] = df["title"].str.split(" ").str[0].str.split("-").str[0]
+    return df
+
+
+def _cached(kind: str, n: int, build) -> Path:
+    path = SYNTHETIC_DIR / f"{kind}_{_size_label(n)}.csv"
+    if not path.exists():
+        SYNTHETIC_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        build(n).to_csv(tmp, index=False)
+        tmp.replace(path)
+    return path
+
+
+def catalog_csv(n: int) -> Path:
+    """Path of a cached synthetic clean catalog with ``n`` rows"""
+    return _cached("catalog", n, synth_clean)
+
+
+def raw_csv(n: int) -> Path:
+    """Path of a cached synthetic raw scrape with ``n`` rows"""
+    return _cached("raw", n, synth_raw)
+
+
+def listing_html(rows: pd.DataFrame) -> str:
+    """A synthetic Jumia catalog page: ``rows`` as product cards, plus made-up page chrome and filler"""
+    e = html.escape
+    cards = []
+    for r in rows.itertuples():
+        old = f'<div class="old">{e(r.old_price_txt)}</div>' if isinstance(r.old_price_txt, str) else ""
+        badge = f'<div class="bdg _dsct _sm">{e(r.discount_txt)}</div>' if isinstance(r.discount_txt, str) else ""
+        href = r.product_link.replace("https://www.jumia.ma", "")
+        cards.append(
+            f'<article class="prd _fb col c-prd"><a class="core" href="{e(href)}" data-gtm-category="{e(r.category)}">'
+            f'<div class="img-c"><img data-src="{e(r.image_url)}" src="data:image/png;base64,R0lGODlhAQABAAAAACw=" '
+            f'class="img" width="208" height="208" loading="lazy" alt="{e(r.title)}"></div>'
+            f'<div class="info"><h3 class="name">{e(r.title)}</h3><div class="prc">{e(r.price_txt)}</div>'
+            f'<div class="s-prc-w">{old}{badge}</div>'
+            f'<div class="rev"><div class="stars _s">4.2 out of 5<div class="in" style="width:84%"></div></div>(12)</div></div></a>'
+            f'<footer class="ft"><form method="post" action="/cart/add/"><button class="add btn _prim _i -fw _md">Ajouter au panier</button></form></footer>'
+            f'</article>'
+        )
+    nav = "".join(f'<li><a href="/categorie-{i}/" class="itm">Catégorie {i}</a></li>' for i in range(120))
+    filters = "".join(f'<label class="fk-cb"><input type="checkbox" name="brand" value="b{i}">Marque {i}</label>' for i in range(80))
+    script = "window.__STORE__=" + "{" + ",".join(f'"k{i}":"{"x" * 40}"' for i in range(300)) + "};"
+    return (
+        '<!DOCTYPE html><html lang="fr"><head><meta charset="utf-8"><title>Téléphones &amp; Tablettes | Jumia Maroc</title>'
+        f'<script>{script}</script></head><body><header><nav><ul class="menu">{nav}</ul></nav></header>'
+        f'<main class="-pvs"><aside class="col4">{filters}</aside>'
+        f'<section class="card -fh"><div class="-paxs row _no-g _4cps">{"".join(cards)}</div>'
+        '<div class="pg-w -ptm -pbxl"><a class="pg" href="?page=2#catalog-listing">2</a></div></section></main>'
+        '<footer><p>© Jumia Maroc</p></footer></body></html>\n'
+    )
+
+
+def write_listing_fixture(cards: int = 40) -> Path:
+    """Rebuild the synthetic listing fixture from the first page of ``jumia_raw.csv``"""
+    raw = pd.read_csv(RAW_CSV)
+    first = raw["page_url"].iloc[0]
+    LISTING_HTML.write_text(listing_html(raw[raw["page_url"] == first].head(cards)), encoding="utf-8")
+    return LISTING_HTML
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10k,100k", help="comma separated row counts, e.g. 10k,100k,1m")
+    parser.add_argument("--listing", action="store_true", help="rewrite the synthetic parse_listing HTML fixture instead")
+    args = parser.parse_args()
+
+    if args.listing:
+        print(write_listing_fixture())
+        return
+    for n in parse_sizes(args.sizes):
+        print(catalog_csv(n))
+        print(raw_csv(n))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Brand resolution: map the start of a product title to a canonical brand.
+
+``brands.json`` holds canonical names and their aliases ("redmi" -> Xiaomi,
+"iphone" -> Apple). The first one or two title tokens are looked up in a hash
+map; titles that open with a generic word ("Câble", "Pochette"...) are scanned
+for a brand further on, and unknown tokens get one cached fuzzy match against
+the aliases to catch typos before falling back to the token itself.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+BRANDS_PATH = Path(__file__).with_name("brands.json")
+
+GENERIC_BRAND = "Generic"
+TOKEN_RE = re.compile(r"[^\W_]+")
+
+# Fuzzy matching only for tokens long enough to carry a typo, and only close ones
+FUZZY_MIN_LEN = 5
+FUZZY_MIN_SCORE = 85
+
+# "Pochette pour Samsung" is not a Samsung product: stop scanning here
+SCAN_STOP = {"pour", "for", "compatible", "avec", "with"}
+
+
+class BrandResolver:
+    def __init__(
+        self,
+        brands: Dict[str, List[str]],
+        generic: List[str] = (),
+        blacklist: List[str] = (),
+        no_fuzzy: List[str] = (),
+    ):
+        self.aliases: Dict[str, str] = {}
+        for canonical, aliases in brands.items():
+            for alias in [canonical, *aliases]:
+                self.aliases[" ".join(TOKEN_RE.findall(alias.lower()))] = canonical
+        self.generic = {" ".join(TOKEN_RE.findall(w.lower())) for w in generic}
+        self.blacklist = set(blacklist)
+        self.no_fuzzy = set(no_fuzzy)
+        # typos rarely hit the first letter, so only compare against aliases sharing it
+        self._choices: Dict[str, List[str]] = {}
+        for alias in self.aliases:
+            self._choices.setdefault(alias[0], []).append(alias)
+        self._fuzzy = lru_cache(maxsize=4096)(self._fuzzy_lookup)
+
+    @classmethod
+    def from_file(cls, path: Path = BRANDS_PATH) -> "BrandResolver":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(data["brands"], data.get("generic", []), data.get("blacklist", []), data.get("no_fuzzy", []))
+
+    def _exact(self, tokens: List[str], i: int) -> Optional[str]:
+        return self.aliases.get(" ".join(tokens[i:i + 2])) or self.aliases.get(tokens[i])
+
+    def _fuzzy_lookup(self, token: str) -> Optional[str]:
+        hit = process.extractOne(token, self._choices.get(token[0], []), scorer=fuzz.ratio, score_cutoff=FUZZY_MIN_SCORE)
+        return self.aliases[hit[0]] if hit else None
+
+    def resolve(self, title: Optional[str]) -> Optional[str]:
+        if not title or not isinstance(title, str):
+            return None
+        tokens = TOKEN_RE.findall(title.lower())
+        if not tokens:
+            return None
+
+        brand = self._exact(tokens, 0)
+        if brand:
+            return brand
+
+        head = tokens[0]
+        if head in self.generic or " ".join(tokens[:2]) in self.generic or head.isdigit():
+            for i in range(1, len(tokens)):
+                if tokens[i] in SCAN_STOP:
+                    break
+                brand = self._exact(tokens, i)
+                if brand:
+                    return brand
+            return GENERIC_BRAND
+
+        if head in self.blacklist:
+            return None
+        if len(head) >= FUZZY_MIN_LEN and head not in self.no_fuzzy:
+            brand = self._fuzzy(head)
+            if brand:
+                return brand
+        return head.title()
+
+    def resolve_series(self, titles: pd.Series) -> pd.Series:
+        """Categorical brand column, resolving each distinct title once."""
+        codes, uniques = pd.factorize(titles)
+        brands = np.array([*map(self.resolve, uniques.tolist()), None], dtype=object)
+        return pd.Series(pd.Categorical(brands[codes]), index=titles.index)
+
+
+@lru_cache(maxsize=1)
+def default_resolver() -> BrandResolver:
+    return BrandResolver.from_file()
+
+
+# Titles that once resolved to the wrong brand; ``python brands.py`` checks them
+REGRESSIONS = {
+    "Deep Bass R9 écouteurs casque Bluetooth V5.0+EDR sans fil": "Deep",
+    "Deep Bass R8 Casque pliables Sans Fil Bluetooth Hifi": "Deep",
+    "Deep Silver Dead Island 2 PS5": "Deep Silver",
+    "Square Enix Final Fantasy XVI 16 PS5": "Square Enix",
+    "Santa Monica Studio God of War Ragnarok PS5": "Santa Monica Studio",
+    "Epic Games Alan Wake 2 Deluxe Edition - PS5": "Epic Games",
+    "Warner Bros. Interactive Hogwarts Legacy PS5": "Warner Bros",
+    "EA Sports FC 24 PS5": "Electronic Arts",
+    "XIAOMI Mi Smart Band 6": "Xiaomi",
+    "Banda  G12 US Pack Gaming 4 IN 1 - Casque + Souris + Tapis": "Banda",
+    "Bandai Namco Tekken 8 PS5": "Bandai Namco",
+    "Pochette pour Samsung Galaxy A16": GENERIC_BRAND,
+}
+
+
+if __name__ == "__main__":
+    resolver = default_resolver()
+    wrong = {t: (b, resolver.resolve(t)) for t, b in REGRESSIONS.items() if resolver.resolve(t) != b}
+    for title, (expected, got) in wrong.items():
+        print(f"{title!r}: expected {expected}, got {got}")
+    print(f"{len(REGRESSIONS) - len(wrong)}/{len(REGRESSIONS)} brand regressions pass")
+    raise SystemExit(1 if wrong else 0)
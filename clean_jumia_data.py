@@ -1,33 +1,23 @@
 
 from __future__ import annotations
 
+import json
+import os
 import re
+import time
 from pathlib import Path
 from typing import Optional
 
 import numpy as np
 import pandas as pd
 
+from product_space import COORD_COLS, project
+from type_classifier import default_classifier
+from brands import default_resolver
+
 RAW_CSV = Path("jumia_raw.csv")
 CLEAN_CSV = Path("jumia_products_clean.csv")
 
-# ---------------------------------------------------------------------------
-# Regex maps for product‑type classification
-# ---------------------------------------------------------------------------
-TYPE_PATTERNS = {
-    "smartphone": r"\b(?:smartphone|phone|galaxy|iphone)\b",
-    "laptop": r"\blaptop|notebook|macbook|ideapad|thinkpad|inspiron\b",
-    "tablet": r"\btablet|ipad|tab\b",
-    "tv": r"\b(?:televis(?:ion)?|smart\s*tv|led\s*tv|uhd\s*tv)\b",
-    "earpods": r"\b(?:earpods?|earbuds?|airpods?)\b",
-    "smartwatch": r"\bwatch\b",
-    "remote": r"\bremote\b",
-    "console": r"\b(?:playstation|ps5|xbox|nintendo|switch)\b",
-}
-
-# Brand blacklist to avoid fuzzy confusion
-BRAND_BLACKLIST = {"vision", "visio", "no"}  # "No Brand" often appears
-
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -51,19 +41,15 @@ def to_float(txt: str | float | int | None) -> Optional[float]:
 
 
 def classify_type(title: str | None) -> Optional[str]:
-    if not title:
-        return None
-    low = title.lower()
-    for t, pat in TYPE_PATTERNS.items():
-        if re.search(pat, low):
-            return t
-    return None
+    """Product type from the rules in product_types.json, else None."""
+    return default_classifier().classify(title)
 
 # ---------------------------------------------------------------------------
 # Cleaning pipeline
 # ---------------------------------------------------------------------------
 
 def clean():
+    started = time.perf_counter()
     if not RAW_CSV.exists():
         raise FileNotFoundError(f"Raw file {RAW_CSV} missing – run scraper first.")
 
@@ -84,13 +70,16 @@ def clean():
     df.loc[df["discount_percentage"] < 0, "discount_percentage"] = np.nan
 
     # --- brand --------------------------------------------------------------
-    df["brand"] = (
-        df["title"].fillna("").str.extract(r"^(\w+)", expand=False).str.title()
-    )
-    df.loc[df["brand"].str.lower().isin(BRAND_BLACKLIST), "brand"] = np.nan
+    # canonical names from brands.json ("Redmi" -> Xiaomi); the scraper's
+    # brand_guess only helps when the title itself is missing
+    titles = df["title"].fillna(df["brand_guess"]) if "brand_guess" in df else df["title"]
+    df["brand"] = default_resolver().resolve_series(titles)
 
     # --- type ---------------------------------------------------------------
-    df["type_product"] = df["title"].apply(classify_type)
+    df["type_product"] = default_classifier().classify_series(df["title"])
+
+    # --- product-space projection (computed once per dataset) --------------
+    df[COORD_COLS] = project(df)
 
     # --- Final tidy DataFrame ----------------------------------------------
     keep_cols = [
@@ -104,10 +93,16 @@ def clean():
         "image_url",  # thumbnail from scraper
         "category",
         "page_url",
+        *COORD_COLS,
     ]
     tidy = df[keep_cols]
-    tidy.to_csv(CLEAN_CSV, index=False)
+    # write then rename so the API never loads a half-written file
+    tmp = CLEAN_CSV.with_suffix(".tmp")
+    tidy.to_csv(tmp, index=False)
+    os.replace(tmp, CLEAN_CSV)
     print(f"✔ Cleaned dataset saved to {CLEAN_CSV} – {len(tidy):,} rows.")
+    seconds = time.perf_counter() - started
+    print("METRICS " + json.dumps({"rows": len(tidy), "seconds": round(seconds, 3), "rows_per_sec": round(len(tidy) / seconds, 1)}))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,240 @@
+"""
+Fetch layer shared by the scrapers: retries, circuit breaker, page cache, record/replay.
+
+Every successful page is saved (gzipped JSON, one file per URL) under
+``FETCH_DIR``, which makes the store both an HTTP cache and a recording of the
+run. ``FETCH_MODE`` picks how it is used:
+
+* ``live`` (default) – reuse a saved page younger than ``FETCH_CACHE_TTL``
+  seconds, revalidate older ones with ETag / Last-Modified, fetch the rest.
+* ``record`` – always fetch and save, e.g. into a fresh directory per run.
+* ``replay`` – never touch the network; a page that was not recorded is an error.
+
+    FETCH_MODE=record FETCH_DIR=recordings/run1 python pipeline.py
+    FETCH_MODE=replay FETCH_DIR=recordings/run1 python pipeline.py   # offline
+
+Network errors and 429/5xx answers are retried with jittered exponential
+backoff; a host that keeps failing trips a circuit breaker so the remaining
+pages fail fast instead of burning the scheduler's time budget.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import random
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+import requests
+
+MODES = ("live", "record", "replay")
+MODE = os.environ.get("FETCH_MODE", "live")
+FETCH_DIR = Path(os.environ.get("FETCH_DIR", ".cache/http"))
+CACHE_TTL = float(os.environ.get("FETCH_CACHE_TTL", "3600"))
+
+TIMEOUT = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0   # seconds; the n-th retry waits up to BASE * 2**n
+BACKOFF_CAP = 30.0
+
+BREAKER_THRESHOLD = 5  # consecutive failures before a host is cut off
+BREAKER_COOLDOWN = 60.0
+
+# Response headers worth keeping with a saved page
+KEPT_HEADERS = ("content-type", "etag", "last-modified")
+
+
+class FetchError(Exception):
+    """A page could not be obtained (retries exhausted, replay miss...)."""
+
+
+class CircuitOpen(FetchError):
+    """The host failed too often recently; not even trying."""
+
+
+def backoff(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Seconds to wait before retry ``attempt`` (0-based): full jitter, or the server's Retry-After."""
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), BACKOFF_CAP)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+@dataclass
+class Page:
+    url: str
+    status: int
+    text: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    fetched_at: float = field(default_factory=time.time)
+    from_store: bool = False
+
+
+class PageStore:
+    """Saved pages, one gzipped JSON file per URL, grouped by host."""
+
+    def __init__(self, root: Path = FETCH_DIR):
+        self.root = Path(root)
+
+    def _path(self, url: str) -> Path:
+        key = hashlib.sha1(url.encode()).hexdigest()[:20]
+        return self.root / (urlparse(url).hostname or "local") / f"{key}.json.gz"
+
+    def load(self, url: str) -> Optional[Page]:
+        try:
+            data = json.loads(gzip.decompress(self._path(url).read_bytes()))
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        return Page(**data, from_store=True)
+
+    def save(self, page: Page) -> None:
+        path = self._path(page.url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {k: v for k, v in asdict(page).items() if k != "from_store"}
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(gzip.compress(json.dumps(data, ensure_ascii=False).encode("utf-8")))
+        os.replace(tmp, path)
+
+    def __iter__(self) -> Iterator[Page]:
+        for path in sorted(self.root.glob("*/*.json.gz")):
+            page = json.loads(gzip.decompress(path.read_bytes()))
+            yield Page(**page, from_store=True)
+
+
+class CircuitBreaker:
+    """Per-host breaker: opens after ``threshold`` consecutive failures, lets one try through after ``cooldown``."""
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures: Counter = Counter()
+        self._opened: Dict[str, float] = {}
+
+    def check(self, host: str) -> None:
+        opened = self._opened.get(host)
+        if opened is not None and time.monotonic() - opened < self.cooldown:
+            raise CircuitOpen(f"{host}: circuit open after {self._failures[host]} consecutive failures")
+
+    def success(self, host: str) -> None:
+        self._failures.pop(host, None)
+        self._opened.pop(host, None)
+
+    def failure(self, host: str) -> None:
+        self._failures[host] += 1
+        if self._failures[host] >= self.threshold:
+            # (re)open; after the cooldown a single trial request decides
+            self._opened[host] = time.monotonic()
+
+
+class Fetcher:
+    """``requests`` with retries, a circuit breaker, politeness delay and the page store."""
+
+    def __init__(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        delay: float = 0.0,
+        mode: str = MODE,
+        store: Optional[PageStore] = None,
+        ttl: float = CACHE_TTL,
+        timeout: float = TIMEOUT,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"FETCH_MODE must be one of {', '.join(MODES)}, got {mode!r}")
+        self.mode = mode
+        self.delay = delay
+        self.ttl = ttl
+        self.timeout = timeout
+        self.store = store or PageStore()
+        self.breaker = CircuitBreaker()
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        self.stats: Counter = Counter()
+        self._last_request: Dict[str, float] = {}
+
+    def check_circuit(self, host: str, attempt: int = 0) -> None:
+        """Raise :class:`CircuitOpen` if ``host`` is cut off; the page counts as failed if already tried, else skipped."""
+        try:
+            self.breaker.check(host)
+        except CircuitOpen:
+            self.stats["failed" if attempt else "skipped"] += 1
+            raise
+
+    def stored(self, url: str) -> Optional[Page]:
+        """Saved copy to use instead of the network: any recording when replaying, a fresh one in live mode."""
+        if self.mode == "record":
+            return None
+        page = self.store.load(url)
+        if self.mode == "replay":
+            if page is None:
+                raise FetchError(f"{url}: not in recording {self.store.root}")
+        elif page is None or time.time() - page.fetched_at > self.ttl:
+            return None
+        self.stats["stored"] += 1
+        return page
+
+    def get(self, url: str) -> Page:
+        """The page at ``url``; raises :class:`FetchError` once retries are exhausted."""
+        page = self.stored(url)
+        if page is not None:
+            return page
+
+        host = urlparse(url).hostname or ""
+        stale = self.store.load(url) if self.mode == "live" else None
+        conditional = {}
+        if stale is not None:
+            if "etag" in stale.headers:
+                conditional["If-None-Match"] = stale.headers["etag"]
+            if "last-modified" in stale.headers:
+                conditional["If-Modified-Since"] = stale.headers["last-modified"]
+
+        error, retry_after = "", None
+        for attempt in range(MAX_RETRIES + 1):
+            if attempt:
+                self.stats["retries"] += 1
+                time.sleep(backoff(attempt - 1, retry_after))
+            self.check_circuit(host, attempt)
+            self._wait_turn(host)
+            try:
+                r = self.session.get(url, timeout=self.timeout, headers=conditional)
+            except requests.RequestException as e:
+                self.breaker.failure(host)
+                error, retry_after = type(e).__name__, None
+                continue
+
+            if r.status_code == 304 and stale is not None:
+                self.breaker.success(host)
+                self.stats["revalidated"] += 1
+                stale.fetched_at = time.time()
+                self.store.save(stale)
+                return stale
+            if r.status_code in RETRY_STATUSES:
+                self.breaker.failure(host)
+                error, retry_after = f"HTTP {r.status_code}", r.headers.get("Retry-After")
+                continue
+
+            # a 404 still means the host is up
+            self.breaker.success(host)
+            self.stats["network"] += 1
+            page = Page(url, r.status_code, r.text, {k: r.headers[k] for k in KEPT_HEADERS if k in r.headers})
+            if r.status_code == 200:
+                self.store.save(page)
+            return page
+
+        self.stats["failed"] += 1
+        raise FetchError(f"{url}: {error} after {MAX_RETRIES + 1} attempts")
+
+    def _wait_turn(self, host: str) -> None:
+        """Keep at least ``delay`` seconds between requests to the same host."""
+        last = self._last_request.get(host)
+        if last is not None:
+            wait = self.delay - (time.monotonic() - last)
+            if wait > 0:
+                time.sleep(wait)
+        self._last_request[host] = time.monotonic()
@@ -8,28 +8,20 @@ function Navbar() {
     const [isRefreshing, setIsRefreshing] = useState(false)
 
     useEffect(() => {
-        fetchStatus()
-        const interval = setInterval(fetchStatus, 30000)
-        return () => clearInterval(interval)
+        // The server pushes the current status on connect, then on every change
+        const source = new EventSource('/api/events')
+        source.addEventListener('status', (e) => setStatus(JSON.parse(e.data)))
+        source.addEventListener('dataset', (e) => {
+            const data = JSON.parse(e.data)
+            setStatus(prev => ({ ...prev, products_count: data.products_count, data_version: data.version }))
+        })
+        return () => source.close()
     }, [])
 
-    const fetchStatus = async () => {
-        try {
-            const res = await fetch('/api/scrape/status')
-            if (res.ok) {
-                const data = await res.json()
-                setStatus(data)
-            }
-        } catch (err) {
-            console.error('Failed to fetch status:', err)
-        }
-    }
-
     const triggerScrape = async () => {
         setIsRefreshing(true)
         try {
             await fetch('/api/scrape/trigger', { method: 'POST' })
-            setTimeout(fetchStatus, 2000)
         } catch (err) {
             console.error('Failed to trigger scrape:', err)
         }
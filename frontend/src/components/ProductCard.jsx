@@ -1,5 +1,10 @@
 import { ExternalLink } from 'lucide-react'
 
+const PLACEHOLDER = 'https://via.placeholder.com/300x200?text=No+Image'
+
+// Resized WebP served and cached by the API instead of the retailer's full image
+const proxied = (url, width) => `/api/images?url=${encodeURIComponent(url)}&w=${width}`
+
 function ProductCard({ product }) {
     const formatPrice = (price) => {
         if (!price) return 'N/A'
@@ -13,12 +18,22 @@ function ProductCard({ product }) {
             )}
 
             <img
-                src={product.image_url || 'https://via.placeholder.com/300x200?text=No+Image'}
+                src={product.image_url ? proxied(product.image_url, 160) : PLACEHOLDER}
+                srcSet={product.image_url ? `${proxied(product.image_url, 160)} 1x, ${proxied(product.image_url, 320)} 2x` : undefined}
                 alt={product.title || 'Product'}
                 className="product-image"
                 loading="lazy"
+                decoding="async"
                 onError={(e) => {
-                    e.target.src = 'https://via.placeholder.com/300x200?text=No+Image'
+                    // proxy down or host not allowed: fall back to the retailer's copy once
+                    const img = e.target
+                    if (product.image_url && !img.dataset.direct) {
+                        img.dataset.direct = '1'
+                        img.removeAttribute('srcset')
+                        img.src = product.image_url
+                    } else {
+                        img.src = PLACEHOLDER
+                    }
                 }}
             />
 
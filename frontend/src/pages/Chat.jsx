@@ -7,17 +7,8 @@ function Chat() {
     ])
     const [input, setInput] = useState('')
     const [loading, setLoading] = useState(false)
-    const [products, setProducts] = useState([])
     const messagesEndRef = useRef(null)
 
-    useEffect(() => {
-        // Load products once
-        fetch('/api/products?per_page=1000')
-            .then(res => res.json())
-            .then(data => setProducts(data.products || []))
-            .catch(() => { })
-    }, [])
-
     const scrollToBottom = () => {
         messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' })
     }
@@ -26,48 +17,12 @@ function Chat() {
         scrollToBottom()
     }, [messages])
 
-    const searchProducts = (query) => {
-        const q = query.toLowerCase()
-        let results = [...products]
-
-        // Extract price constraints
-        const underMatch = q.match(/under\s+(\d+)/)
-        const aboveMatch = q.match(/(?:above|over)\s+(\d+)/)
-        const maxPrice = underMatch ? parseInt(underMatch[1]) : null
-        const minPrice = aboveMatch ? parseInt(aboveMatch[1]) : null
-
-        // Apply price filters
-        if (maxPrice) results = results.filter(p => (p.price_numeric || 0) <= maxPrice)
-        if (minPrice) results = results.filter(p => (p.price_numeric || 0) >= minPrice)
-
-        // Check for discount requests
-        if (q.includes('discount') || q.includes('sale') || q.includes('deal')) {
-            results = results.filter(p => (p.discount_percentage || 0) > 20)
-            results.sort((a, b) => (b.discount_percentage || 0) - (a.discount_percentage || 0))
-        }
-
-        // Check for cheap/budget requests
-        if (q.includes('cheap') || q.includes('budget') || q.includes('affordable')) {
-            results.sort((a, b) => (a.price_numeric || 0) - (b.price_numeric || 0))
-        }
-
-        // Check for best/top requests
-        if (q.includes('best') || q.includes('top')) {
-            results = results.filter(p => (p.discount_percentage || 0) > 15)
-        }
-
-        // Keyword search in title/brand/category
-        const keywords = q.replace(/under\s+\d+/g, '').replace(/above\s+\d+/g, '')
-            .split(/\s+/).filter(w => w.length > 2 && !['the', 'and', 'for', 'with', 'show', 'find', 'get', 'best', 'good'].includes(w))
-
-        if (keywords.length > 0) {
-            results = results.filter(p => {
-                const text = `${p.title} ${p.brand} ${p.category} ${p.type_product}`.toLowerCase()
-                return keywords.some(kw => text.includes(kw))
-            })
-        }
-
-        return results.slice(0, 8)
+    const searchProducts = async (query) => {
+        const params = new URLSearchParams({ q: query, limit: '8' })
+        const res = await fetch(`/api/chat/query?${params}`)
+        if (!res.ok) throw new Error(`HTTP ${res.status}`)
+        const data = await res.json()
+        return data.products
     }
 
     const formatResponse = (query, results) => {
@@ -96,11 +51,14 @@ function Chat() {
         setMessages(prev => [...prev, { role: 'user', content: userMessage }])
         setLoading(true)
 
-        // Simulate slight delay for better UX
-        await new Promise(r => setTimeout(r, 500))
-
-        const results = searchProducts(userMessage)
-        const response = formatResponse(userMessage, results)
+        let response
+        try {
+            const results = await searchProducts(userMessage)
+            response = formatResponse(userMessage, results)
+        } catch (err) {
+            console.error('Search failed:', err)
+            response = 'Sorry, the search service is unavailable right now. Please try again later.'
+        }
 
         setMessages(prev => [...prev, { role: 'assistant', content: response }])
         setLoading(false)
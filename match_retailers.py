@@ -0,0 +1,226 @@
+"""
+Cross‑retailer product matching (Jumia ⇄ Electroplanet)
+-------------------------------------------------------
+Finds the same product sold by both retailers so the API can show
+"same product, cheaper elsewhere".
+
+Naive all‑pairs fuzzy matching is O(N×M). Instead, candidates are first
+grouped into *blocks* that share either
+
+* brand + product type (``classify_type``), or
+* a model‑number token such as ``H65S80EUX`` or ``32EAHD-A24``,
+
+and only titles inside the same block are scored, in one batched
+``rapidfuzz.process.cdist`` call per block using every core. Block results
+are cached on disk keyed by the block's titles, so re‑runs only score
+blocks whose contents changed.
+
+Usage::
+
+    python match_retailers.py  # writes product_matches.csv
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+from brands import GENERIC_BRAND, default_resolver
+from clean_jumia_data import CLEAN_CSV, classify_type, to_float
+
+ELECTROPLANET_JSONL = Path("electroplanet_products.jsonl")
+MATCHES_CSV = Path("product_matches.csv")
+CACHE_PATH = Path(".cache/match_blocks.pkl")
+
+# Electroplanet category label ➜ our product type
+CATEGORY_TYPES = {"smartphones": "smartphone", "televisions": "tv", "laptops": "laptop"}
+
+MIN_SCORE = 85        # same brand & type, titles alone must agree strongly
+MIN_MODEL_SCORE = 60  # a shared model number lowers the bar
+SCORER = fuzz.token_set_ratio
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9\-]*[a-z0-9]")
+# capacity / size tokens that look like model numbers but are not
+UNIT_RE = re.compile(r"^\d+(?:gb|go|tb|to|mah|w|hz|mp|k|g|p|ml|cm|mm|m|v|a|inch|pouces)$")
+
+# ---------------------------------------------------------------------------
+# Normalisation
+# ---------------------------------------------------------------------------
+
+def normalise(title: str) -> str:
+    # str.split() also breaks on NBSP / narrow NBSP
+    return " ".join(str(title).lower().split())
+
+
+def model_tokens(title: str) -> Set[str]:
+    """Alphanumeric tokens mixing letters and digits, e.g. ``h65s80eux``."""
+    tokens = set()
+    for tok in TOKEN_RE.findall(normalise(title)):
+        flat = tok.replace("-", "")
+        if len(flat) >= 5 and re.search(r"\d", flat) and re.search(r"[a-z]", flat) and not UNIT_RE.match(flat):
+            tokens.add(flat)
+    return tokens
+
+
+def block_keys(brand: str | None, ptype: str | None, title: str) -> Set[Tuple[str, ...]]:
+    keys: Set[Tuple[str, ...]] = {("model", m) for m in model_tokens(title)}
+    if brand and brand != GENERIC_BRAND.lower():
+        keys.add(("brand", brand, ptype or ""))
+    return keys
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+def load_jumia() -> pd.DataFrame:
+    df = pd.read_csv(CLEAN_CSV)
+    df = df.dropna(subset=["title", "price_numeric"]).drop_duplicates("product_link")
+    return pd.DataFrame({
+        "title": df["title"],
+        "link": df["product_link"],
+        "price": df["price_numeric"],
+        "brand": df["brand"].str.lower(),
+        "type": df["type_product"],
+    }).reset_index(drop=True)
+
+
+def load_electroplanet() -> pd.DataFrame:
+    rows = [json.loads(line) for line in ELECTROPLANET_JSONL.open(encoding="utf-8") if line.strip()]
+    df = pd.DataFrame(rows, columns=["category", "name", "price", "url", "image"])
+    return pd.DataFrame({
+        "title": df["name"],
+        "link": df["url"],
+        "image": df["image"],
+        "price": df["price"].apply(to_float),
+        "brand": default_resolver().resolve_series(df["name"]).str.lower(),
+        "type": [CATEGORY_TYPES.get(c) or classify_type(n) for c, n in zip(df["category"], df["name"])],
+    }).dropna(subset=["title", "price"]).drop_duplicates("link").reset_index(drop=True)
+
+# ---------------------------------------------------------------------------
+# Blocking & scoring
+# ---------------------------------------------------------------------------
+
+def build_blocks(left: pd.DataFrame, right: pd.DataFrame) -> Dict[Tuple[str, ...], Tuple[List[int], List[int]]]:
+    """Group row indices of both sides by shared block key."""
+    blocks: Dict[Tuple[str, ...], Tuple[List[int], List[int]]] = defaultdict(lambda: ([], []))
+    for side, df in ((0, left), (1, right)):
+        for i, (brand, ptype, title) in enumerate(zip(df["brand"], df["type"], df["title"])):
+            for key in block_keys(brand if isinstance(brand, str) else None,
+                                  ptype if isinstance(ptype, str) else None, title):
+                blocks[key][side].append(i)
+    return {k: v for k, v in blocks.items() if v[0] and v[1]}
+
+
+class BlockCache:
+    """Pickled map of block fingerprint ➜ scored pairs above the cut‑off."""
+
+    def __init__(self, path: Path = CACHE_PATH):
+        self.path = path
+        self.hits = self.misses = 0
+        try:
+            self._data: Dict[str, list] = pickle.loads(path.read_bytes())
+        except (FileNotFoundError, pickle.UnpicklingError, EOFError):
+            self._data = {}
+        self._used: Dict[str, list] = {}
+
+    @staticmethod
+    def key(kind: str, queries: Iterable[str], choices: Iterable[str]) -> str:
+        h = hashlib.sha1(f"{SCORER.__name__}|{kind}".encode())
+        h.update("\x1f".join(queries).encode())
+        h.update(b"\x1e")
+        h.update("\x1f".join(choices).encode())
+        return h.hexdigest()
+
+    def get(self, key: str):
+        if key in self._data:
+            self.hits += 1
+            self._used[key] = self._data[key]
+            return self._used[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: str, value: list):
+        self._used[key] = value
+
+    def save(self):
+        # keep only blocks seen in this run so the cache cannot grow forever
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_bytes(pickle.dumps(self._used, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def score_blocks(left: pd.DataFrame, right: pd.DataFrame, cache: BlockCache) -> Dict[Tuple[int, int], float]:
+    """Best score per (left, right) pair that passes its block's threshold."""
+    lt = [normalise(t) for t in left["title"]]
+    rt = [normalise(t) for t in right["title"]]
+    best: Dict[Tuple[int, int], float] = {}
+
+    for key, (li, ri) in build_blocks(left, right).items():
+        kind = key[0]
+        cutoff = MIN_MODEL_SCORE if kind == "model" else MIN_SCORE
+        queries, choices = [lt[i] for i in li], [rt[j] for j in ri]
+        ck = cache.key(kind, queries, choices)
+        pairs = cache.get(ck)
+        if pairs is None:
+            scores = process.cdist(queries, choices, scorer=SCORER, score_cutoff=cutoff, workers=-1)
+            qi, ci = np.nonzero(scores)
+            pairs = [(int(a), int(b), float(scores[a, b])) for a, b in zip(qi, ci)]
+            cache.put(ck, pairs)
+        for a, b, s in pairs:
+            pair = (li[a], ri[b])
+            if s > best.get(pair, -1):
+                best[pair] = s
+    return best
+
+
+def match(left: pd.DataFrame, right: pd.DataFrame, cache: BlockCache) -> pd.DataFrame:
+    best = score_blocks(left, right, cache)
+    if not best:
+        return pd.DataFrame(columns=[
+            "title", "product_link", "price", "retailer",
+            "other_title", "other_link", "other_image", "other_price", "score",
+        ])
+    pairs = np.array(list(best.keys()))
+    lrows, rrows = left.iloc[pairs[:, 0]], right.iloc[pairs[:, 1]]
+    out = pd.DataFrame({
+        "title": lrows["title"].to_numpy(),
+        "product_link": lrows["link"].to_numpy(),
+        "price": lrows["price"].to_numpy(),
+        "retailer": "electroplanet",
+        "other_title": rrows["title"].to_numpy(),
+        "other_link": rrows["link"].to_numpy(),
+        "other_image": rrows["image"].to_numpy(),
+        "other_price": rrows["price"].to_numpy(),
+        "score": np.round(list(best.values()), 1),
+    })
+    # already one row per (Jumia product, Electroplanet product): the loaders drop
+    # duplicate links and ``best`` keeps one score per pair; best offers first
+    return out.sort_values(["product_link", "score"], ascending=[True, False]).reset_index(drop=True)
+
+
+def main():
+    if not CLEAN_CSV.exists() or not ELECTROPLANET_JSONL.exists():
+        raise FileNotFoundError("Need both cleaned Jumia CSV and Electroplanet JSONL – run the scrapers first.")
+    left, right = load_jumia(), load_electroplanet()
+    cache = BlockCache()
+    out = match(left, right, cache)
+    cache.save()
+    # the API reloads the matches when the file changes: never let it see a half-written one
+    tmp = MATCHES_CSV.with_suffix(".tmp")
+    out.to_csv(tmp, index=False)
+    os.replace(tmp, MATCHES_CSV)
+    print(f"✔ {len(out):,} matches ({len(left):,} × {len(right):,} products, "
+          f"{cache.hits} cached / {cache.misses} scored blocks) ➜ {MATCHES_CSV}")
+
+
+if __name__ == "__main__":
+    main()
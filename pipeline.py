@@ -0,0 +1,58 @@
+"""
+Run the scraping pipeline in one interpreter: scrape Jumia, clean, match retailers.
+
+    python pipeline.py [scrape] [clean] [match]
+
+The API scheduler used to start a fresh Python process per stage, each one
+importing pandas, bs4 and the pipeline modules again. Here the stages share a
+process. Before each stage a ``STAGE <name>`` line is printed so the caller can
+report progress and attribute the ``METRICS {json}`` lines that follow; a
+failing stage prints its traceback and ``FAILED <name>``, then the next one runs.
+"""
+
+from __future__ import annotations
+
+import sys
+import traceback
+
+STAGE_PREFIX = "STAGE "
+FAILED_PREFIX = "FAILED "
+
+
+# stage modules are imported when run, so importing this file stays cheap
+def run_scrape():
+    from scraper_jumia_electronics import report_stats, save_csv, scrape
+    save_csv(scrape())
+    report_stats()
+
+
+def run_clean():
+    from clean_jumia_data import clean
+    clean()
+
+
+def run_match():
+    from match_retailers import main
+    main()
+
+
+STAGES = {"scrape": run_scrape, "clean": run_clean, "match": run_match}
+
+
+def run(stages) -> int:
+    """Run ``stages`` in order; returns how many failed"""
+    failed = 0
+    for name in stages:
+        print(STAGE_PREFIX + name, flush=True)
+        try:
+            STAGES[name]()
+        except Exception:
+            traceback.print_exc(file=sys.stdout)
+            print(FAILED_PREFIX + name)
+            failed += 1
+        sys.stdout.flush()
+    return failed
+
+
+if __name__ == "__main__":
+    sys.exit(1 if run(sys.argv[1:] or list(STAGES)) else 0)
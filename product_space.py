@@ -0,0 +1,45 @@
+"""
+2‑D product‑space projection computed once per dataset at cleaning time.
+
+Brand and type are one‑hot encoded into a *sparse* matrix next to the
+standardised price & discount, then reduced with randomized truncated SVD.
+Memory grows with the number of non‑zeros (4 per product), not with the
+number of distinct brands.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+NUMERIC_COLS = ["price_numeric", "discount_percentage"]
+CATEGORICAL_COLS = ["brand", "type_product"]
+COORD_COLS = ["pca_x", "pca_y"]
+
+
+def project(df: pd.DataFrame, random_state: int = 0) -> pd.DataFrame:
+    """Return ``pca_x``/``pca_y`` for every row (NaN where the price is missing)."""
+    out = pd.DataFrame(np.nan, index=df.index, columns=COORD_COLS, dtype="float32")
+    if df.empty or not set(NUMERIC_COLS + CATEGORICAL_COLS) <= set(df.columns):
+        return out
+
+    rows = df["price_numeric"].notna().to_numpy()
+    if rows.sum() < 3:
+        return out
+    base = df.loc[rows]
+
+    # imported here: scipy/sklearn take ~1.5 s to load and the API only needs
+    # them for a CSV written before the coordinates were precomputed
+    from scipy import sparse
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    num = base[NUMERIC_COLS].astype("float64").fillna({"discount_percentage": 0.0})
+    num = StandardScaler().fit_transform(num)
+    cat = base[CATEGORICAL_COLS].astype(object).fillna("unknown").astype(str)
+    onehot = OneHotEncoder(handle_unknown="ignore", sparse_output=True).fit_transform(cat)
+
+    X = sparse.hstack([sparse.csr_matrix(num), onehot], format="csr")
+    svd = TruncatedSVD(n_components=2, algorithm="randomized", random_state=random_state)
+    out.loc[rows, COORD_COLS] = svd.fit_transform(X).astype("float32")
+    return out
@@ -17,14 +17,21 @@ Tweak the ``START_URLS`` dictionary to add or remove categories you wish to scra
 
 NOTE: Electroplanet renders its catalogue with client‑side JavaScript, so we control a
 headless Chromium browser (via Playwright) instead of using raw ``requests``.
+
+Retries, the circuit breaker and ``FETCH_MODE`` record/replay come from ``fetch.py``:
+the rendered (scrolled) page is saved, and a replay loads it back with
+``page.set_content`` with JavaScript and network disabled.
 """
 
 from __future__ import annotations
 import asyncio, json
 from pathlib import Path
 from typing import List, Dict, Any
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright, Error as PlaywrightError
 
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from fetch import MAX_RETRIES, RETRY_STATUSES, FetchError, Fetcher, Page, backoff
 
 # ---------------------------------------------------------------------------
 # Config
@@ -41,6 +48,9 @@ OUT_PATH = Path("electroplanet_products.jsonl")
 SCROLL_PAUSE_MS = 1500  # tune if products stop loading too soon
 HEADLESS = True  # flip to False to watch the browser when debugging
 
+# Only its page store, circuit breaker and mode are used: the browser does the fetching
+FETCHER = Fetcher()
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -83,21 +93,65 @@ async def extract_cards(page, category: str) -> List[Dict[str, Any]]:
     return data
 
 
+async def visit(page, url: str) -> None:
+    """Loads and scrolls ``url`` with retries and backoff, then saves the rendered page."""
+    host = urlparse(url).hostname or ""
+    error = ""
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            FETCHER.stats["retries"] += 1
+            await asyncio.sleep(backoff(attempt - 1))
+        FETCHER.check_circuit(host, attempt)
+        try:
+            response = await page.goto(url, timeout=60_000)
+        except PlaywrightError as e:  # timeouts included
+            FETCHER.breaker.failure(host)
+            error = str(e).splitlines()[0]
+            continue
+        status = response.status if response else 200
+        if status in RETRY_STATUSES:
+            FETCHER.breaker.failure(host)
+            error = f"HTTP {status}"
+            continue
+
+        FETCHER.breaker.success(host)
+        FETCHER.stats["network"] += 1
+        await auto_scroll(page)
+        if status == 200:
+            FETCHER.store.save(Page(url, status, await page.content()))
+        return
+
+    FETCHER.stats["failed"] += 1
+    raise FetchError(f"{url}: {error} after {MAX_RETRIES + 1} attempts")
+
+
 async def harvest(playwright, label: str, url: str) -> List[Dict[str, Any]]:
+    try:
+        saved = FETCHER.stored(url)
+    except FetchError as e:  # replaying a run that never saw this page
+        print(f"!! {e}")
+        return []
+
     browser = await playwright.chromium.launch(headless=HEADLESS)
     ctx = await browser.new_context(
         locale="fr-FR",
         user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+        # a saved page is already rendered; its scripts would only try to re-fetch it
+        java_script_enabled=saved is None,
     )
     page = await ctx.new_page()
 
-    print(f">>> Visiting {label} ({url})")
     try:
-        await page.goto(url, timeout=60_000)
-        await auto_scroll(page)
+        if saved is not None:
+            print(f">>> Replaying {label} ({url})")
+            await page.route("**/*", lambda route: route.abort())
+            await page.set_content(saved.text)
+        else:
+            print(f">>> Visiting {label} ({url})")
+            await visit(page, url)
         products = await extract_cards(page, label)
-    except PlaywrightTimeoutError:
-        print(f"!! Timeout while loading {url}")
+    except (FetchError, PlaywrightError) as e:
+        print(f"!! Failed to load {url}: {e}")
         products = []
     finally:
         await ctx.close()
@@ -106,6 +160,7 @@ async def harvest(playwright, label: str, url: str) -> List[Dict[str, Any]]:
 
 
 async def main():
+    print(f"Fetch mode: {FETCHER.mode} ({FETCHER.store.root})")
     async with async_playwright() as p:
         all_rows: list[dict[str, Any]] = []
         for label, link in START_URLS.items():
@@ -2,13 +2,16 @@
 from __future__ import annotations
 
 import csv
+import json
 import time
+from collections import Counter
 from pathlib import Path
 from typing import Dict, List, Optional
 
-import requests
 from bs4 import BeautifulSoup, Tag
 
+from fetch import FetchError, Fetcher
+
 RAW_CSV = Path("jumia_raw.csv")
 
 CATEGORIES = {
@@ -19,6 +22,7 @@ CATEGORIES = {
 }
 
 N_PAGES = 20  # scrape pages 1 → 20 inclusive for each category
+PAGE_DELAY = 1.5  # seconds between live requests to jumia.ma
 
 HEADERS = {
     "User-Agent": (
@@ -29,6 +33,9 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
 }
 
+# Run statistics, printed as one "METRICS {json}" line for the API scheduler
+STATS: Dict[str, object] = {"pages": 0, "rows": 0, "parse_seconds": 0.0, "http_status": Counter()}
+
 # ---------------------------------------------------------------------------
 # Helper utilities
 # ---------------------------------------------------------------------------
@@ -106,26 +113,46 @@ def parse_listing(html: str, url: str, cat_key: str) -> List[Dict[str, str]]:
 # ---------------------------------------------------------------------------
 
 def scrape() -> List[Dict[str, str]]:
-    sess = requests.Session(); sess.headers.update(HEADERS)
+    # retries, per-host circuit breaker, page cache and record/replay live in fetch.py
+    fetcher = Fetcher(headers=HEADERS, delay=PAGE_DELAY)
+    print(f"Fetch mode: {fetcher.mode} ({fetcher.store.root})")
     all_rows: List[Dict[str, str]] = []
+    started = time.perf_counter()
 
     for cat_key, base_url in CATEGORIES.items():
         print(f"\n=== {cat_key.upper()} ===")
         for p in range(1, N_PAGES + 1):
             url = f"{base_url}?page={p}#catalog-listing"
             print(f"→ {url}")
-            r = sess.get(url, timeout=30)
-            if r.status_code != 200:
-                print(f"   HTTP {r.status_code} – skipping page")
-                time.sleep(1.5)
+            try:
+                page = fetcher.get(url)
+            except FetchError as e:
+                print(f"   {e} – skipping page")
+                continue
+            STATS["pages"] += 1; STATS["http_status"][str(page.status)] += 1
+            if page.status != 200:
+                print(f"   HTTP {page.status} – skipping page")
                 continue
-            rows = parse_listing(r.text, url, cat_key)
-            print(f"  {len(rows):3d} rows")
+            t0 = time.perf_counter()
+            rows = parse_listing(page.text, url, cat_key)
+            STATS["parse_seconds"] += time.perf_counter() - t0
+            print(f"  {len(rows):3d} rows{' (saved page)' if page.from_store else ''}")
             all_rows.extend(rows)
-            time.sleep(1.5)
+    STATS["rows"] = len(all_rows)
+    STATS["seconds"] = time.perf_counter() - started
+    STATS["fetch"] = dict(fetcher.stats)
     return all_rows
 
 
+def report_stats():
+    seconds, parse_seconds = STATS.get("seconds", 0.0), STATS["parse_seconds"]
+    print("METRICS " + json.dumps({
+        **STATS,
+        "pages_per_sec": round(STATS["pages"] / seconds, 3) if seconds else 0.0,
+        "rows_per_sec": round(STATS["rows"] / parse_seconds, 1) if parse_seconds else 0.0,
+    }))
+
+
 # ---------------------------------------------------------------------------
 # Save helper
 # ---------------------------------------------------------------------------
@@ -142,4 +169,4 @@ def save_csv(rows: List[Dict[str, str]]):
 
 
 if __name__ == "__main__":
-    data = scrape(); save_csv(data)
+    data = scrape(); save_csv(data); report_stats()
@@ -0,0 +1,12 @@
+"""
+Test setup: the project root (scrapers, fetch, brands) and backend/ are
+imported flat, the same way the API and the pipeline run them.
+"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+for path in (ROOT, ROOT / "backend"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
@@ -0,0 +1,94 @@
+"""
+Shared Arrow snapshots: build once, reuse, and recover from a damaged file
+"""
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from arrow_store import ArrowStore
+from catalog import Catalog, SNAPSHOT_LAYOUT, load_products, output_frame
+
+
+@pytest.fixture
+def frame():
+    df = pd.DataFrame({
+        "title": pd.array(["Galaxy A16", "Redmi 14C", None], dtype="string[pyarrow]"),
+        "brand": pd.Categorical(["Samsung", "Xiaomi", "Xiaomi"]),
+        "price_numeric": pd.array([1599.0, 1099.0, float("nan")], dtype="float32"),
+        "image_url": pd.array(["a.jpg", "b.jpg", "c.jpg"], dtype="string[pyarrow]"),
+    })
+    df.attrs["url_prefix"] = {"image_url": "https://ma.jumia.is/unsafe/"}
+    return df
+
+
+class Builder:
+    def __init__(self, df):
+        self.df = df
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.df
+
+
+def test_snapshot_is_built_once_and_published(tmp_path, frame):
+    store = ArrowStore(tmp_path)
+    build = Builder(frame)
+
+    first = store.get("v1", build)
+    second = ArrowStore(tmp_path).get("v1", build)
+
+    assert build.calls == 1
+    assert store.current() == "v1"
+    for df in (first, second):
+        assert df.attrs["url_prefix"] == frame.attrs["url_prefix"]
+        assert df["title"].tolist()[:2] == ["Galaxy A16", "Redmi 14C"]
+        assert df["price_numeric"].isna().tolist() == [False, False, True]
+
+
+@pytest.mark.parametrize("damage", [
+    lambda data: data[: len(data) // 2],   # truncated mid-write
+    lambda data: b"",                      # disk full before the first byte
+    lambda data: b"\0" * len(data),        # garbage of the right size
+])
+def test_damaged_snapshot_is_rebuilt(tmp_path, frame, damage):
+    ArrowStore(tmp_path).get("v1", Builder(frame))
+    path = tmp_path / "v1.arrow"
+    path.write_bytes(damage(path.read_bytes()))
+
+    build = Builder(frame)
+    df = ArrowStore(tmp_path).get("v1", build)
+
+    assert build.calls == 1
+    assert df["brand"].tolist() == ["Samsung", "Xiaomi", "Xiaomi"]
+    assert pa.ipc.open_file(pa.memory_map(str(path))).num_record_batches >= 1
+
+
+def test_publish_keeps_current_and_previous(tmp_path, frame):
+    store = ArrowStore(tmp_path)
+    for version in ("v1", "v2", "v3"):
+        store.get(version, Builder(frame))
+
+    assert store.current() == "v3"
+    assert sorted(p.stem for p in tmp_path.glob("*.arrow")) == ["v2", "v3"]
+
+
+def test_catalog_serves_the_same_rows_from_a_snapshot(tmp_path):
+    csv = tmp_path / "products.csv"
+    pd.DataFrame({
+        "title": ["Galaxy A16", "Redmi 14C"],
+        "brand": ["Samsung", "Xiaomi"],
+        "price_numeric": [1599.0, 1099.5],
+        "image_url": ["https://ma.jumia.is/unsafe/1.jpg", "https://ma.jumia.is/unsafe/2.jpg"],
+        "category": ["telephone_tablette"] * 2,
+    }).to_csv(csv, index=False)
+    store = ArrowStore(tmp_path / "snapshots")
+
+    shared = Catalog(csv, load=load_products, store=store).get()
+    private = Catalog(csv, load=load_products).get()
+
+    assert store.current() == f"{shared.version}-l{SNAPSHOT_LAYOUT}"
+    pd.testing.assert_frame_equal(
+        output_frame(shared.df).astype(object), output_frame(private.df).astype(object), check_dtype=False,
+    )
@@ -0,0 +1,35 @@
+"""
+Brand resolution regressions from brands.REGRESSIONS, plus the rules behind them
+"""
+import pandas as pd
+import pytest
+
+from brands import REGRESSIONS, default_resolver
+
+
+@pytest.fixture(scope="module")
+def resolver():
+    return default_resolver()
+
+
+@pytest.mark.parametrize("title,brand", REGRESSIONS.items())
+def test_regressions(resolver, title, brand):
+    assert resolver.resolve(title) == brand
+
+
+def test_no_fuzzy_brand_only_matches_exactly(resolver):
+    assert resolver.resolve("Banda G12 Casque Gaming") == "Banda"
+    assert resolver.resolve("Bandai Namco Elden Ring PS5") == "Bandai Namco"
+
+
+def test_missing_and_numeric_titles(resolver):
+    assert resolver.resolve(None) is None
+    assert resolver.resolve("") is None
+    assert not str(resolver.resolve("10 Pcs Câble USB-C") or "").isdigit()
+
+
+def test_resolve_series_matches_resolve(resolver):
+    titles = pd.Series(list(REGRESSIONS) + [None, list(REGRESSIONS)[0]])
+    expected = [resolver.resolve(t) for t in titles]
+    got = resolver.resolve_series(titles)
+    assert [None if pd.isna(b) else b for b in got] == expected
@@ -0,0 +1,178 @@
+"""
+Fetch layer: retries and backoff, the circuit breaker, record/replay and
+revalidation, against a local HTTP server that answers from a script
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import fetch
+from fetch import CircuitBreaker, CircuitOpen, Fetcher, FetchError, PageStore
+
+
+class ScriptedServer:
+    """Answers each request with the next status from ``script`` (the last one repeats)"""
+
+    def __init__(self):
+        self.script = [200]
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                status = server.script.pop(0) if len(server.script) > 1 else server.script[0]
+                body = b"" if status == 304 else f"<html>{self.path} {status}</html>".encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("ETag", '"v1"')
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def url(self, path="/page"):
+        return f"http://127.0.0.1:{self.httpd.server_port}{path}"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    s = ScriptedServer()
+    yield s
+    s.close()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(fetch, "BACKOFF_BASE", 0.0)
+
+
+def make_fetcher(tmp_path, mode="record", **kwargs):
+    return Fetcher(mode=mode, store=PageStore(tmp_path / "http"), **kwargs)
+
+
+def test_backoff_is_jittered_capped_and_honours_retry_after(monkeypatch):
+    monkeypatch.setattr(fetch, "BACKOFF_BASE", 1.0)
+    for attempt in range(8):
+        for _ in range(20):
+            assert 0 <= fetch.backoff(attempt) <= min(fetch.BACKOFF_CAP, 2 ** attempt)
+    assert fetch.backoff(0, "7") == 7
+    assert fetch.backoff(0, "3600") == fetch.BACKOFF_CAP
+    # an HTTP-date Retry-After falls back to jitter
+    assert fetch.backoff(0, "Wed, 21 Oct 2026 07:28:00 GMT") <= 1.0
+
+
+def test_retries_transient_errors(server, tmp_path):
+    server.script = [503, 429, 200]
+    fetcher = make_fetcher(tmp_path)
+
+    page = fetcher.get(server.url())
+
+    assert page.status == 200
+    assert len(server.requests) == 3
+    assert fetcher.stats["retries"] == 2
+    assert fetcher.stats["network"] == 1
+
+
+def test_gives_up_after_max_retries(server, tmp_path):
+    server.script = [500]
+    fetcher = make_fetcher(tmp_path)
+
+    with pytest.raises(FetchError, match="HTTP 500"):
+        fetcher.get(server.url())
+
+    assert len(server.requests) == fetch.MAX_RETRIES + 1
+    assert fetcher.stats["failed"] == 1
+
+
+def test_not_found_is_returned_not_retried(server, tmp_path):
+    server.script = [404]
+    fetcher = make_fetcher(tmp_path)
+
+    assert fetcher.get(server.url()).status == 404
+    assert len(server.requests) == 1
+    assert fetcher.breaker._failures["127.0.0.1"] == 0
+
+
+def test_breaker_opens_then_half_opens(server, tmp_path):
+    server.script = [503]
+    fetcher = make_fetcher(tmp_path)
+    fetcher.breaker = CircuitBreaker(threshold=fetch.MAX_RETRIES + 1, cooldown=0.2)
+
+    with pytest.raises(FetchError):
+        fetcher.get(server.url("/a"))
+    calls = len(server.requests)
+
+    # open: other pages on the host fail fast without a request
+    with pytest.raises(CircuitOpen):
+        fetcher.get(server.url("/b"))
+    assert len(server.requests) == calls
+    assert fetcher.stats["skipped"] == 1
+
+    # half-open: one trial after the cooldown; a failure reopens at once
+    time.sleep(0.25)
+    with pytest.raises(CircuitOpen):
+        fetcher.get(server.url("/c"))
+    assert len(server.requests) == calls + 1
+
+    # a successful trial closes it again
+    time.sleep(0.25)
+    server.script = [200]
+    assert fetcher.get(server.url("/d")).status == 200
+    assert fetcher.get(server.url("/e")).status == 200
+    assert "127.0.0.1" not in fetcher.breaker._opened
+
+
+def test_breaker_is_per_host():
+    breaker = CircuitBreaker(threshold=2, cooldown=60)
+    breaker.failure("a.example")
+    breaker.failure("a.example")
+
+    with pytest.raises(CircuitOpen):
+        breaker.check("a.example")
+    breaker.check("b.example")
+
+
+def test_replay_serves_the_recording_offline(server, tmp_path):
+    url = server.url("/listing?page=1")
+    recorded = make_fetcher(tmp_path, mode="record").get(url)
+    server.close()
+
+    replay = make_fetcher(tmp_path, mode="replay")
+    page = replay.get(url)
+
+    assert page.from_store
+    assert page.text == recorded.text
+    assert replay.stats["stored"] == 1
+    with pytest.raises(FetchError, match="not in recording"):
+        replay.get(server.url("/listing?page=2"))
+
+
+def test_live_mode_revalidates_stale_pages(server, tmp_path):
+    url = server.url()
+    make_fetcher(tmp_path, mode="record").get(url)
+
+    fetcher = make_fetcher(tmp_path, mode="live", ttl=0)
+    server.script = [304]
+    page = fetcher.get(url)
+
+    assert page.from_store
+    assert server.requests[-1][1]["If-None-Match"] == '"v1"'
+    assert fetcher.stats["revalidated"] == 1
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError, match="FETCH_MODE"):
+        Fetcher(mode="offline")
@@ -0,0 +1,92 @@
+"""
+Image proxy fetches: redirects must stay on the allowed CDN hosts
+"""
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import images
+from images import ImageCache, ImageUnavailable
+
+PNG = b""
+if images.Image is not None:
+    buf = io.BytesIO()
+    images.Image.new("RGB", (400, 300), "red").save(buf, "PNG")
+    PNG = buf.getvalue()
+
+
+@pytest.fixture
+def server():
+    """Local CDN: /img serves a picture, /r/<n> redirects, /to?url= redirects anywhere"""
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            if self.path.startswith("/to?url="):
+                self.send_response(302)
+                self.send_header("Location", self.path[len("/to?url="):])
+            elif self.path.startswith("/r/"):
+                n = int(self.path[3:])
+                self.send_response(301)
+                self.send_header("Location", f"/r/{n - 1}" if n > 1 else "/img")
+            else:
+                self.send_response(200)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Length", str(len(PNG)))
+                self.end_headers()
+                self.wfile.write(PNG)
+                return
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    httpd.hits = hits
+    httpd.base = f"http://127.0.0.1:{httpd.server_port}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(images, "ALLOWED_HOSTS", {"127.0.0.1"})
+    return ImageCache(tmp_path / "images")
+
+
+def test_rejects_hosts_off_the_allowlist(cache):
+    with pytest.raises(ValueError):
+        cache.thumbnail("http://localhost/img")
+    with pytest.raises(ValueError):
+        cache.thumbnail("file:///etc/passwd")
+
+
+def test_follows_redirects_on_allowed_hosts(server, cache):
+    body, media_type, _ = cache.thumbnail(f"{server.base}/r/2", 80, "jpeg")
+
+    assert server.hits == ["/r/2", "/r/1", "/img"]
+    if images.Image is not None:
+        assert media_type == "image/jpeg"
+    else:
+        assert body == PNG
+
+
+def test_does_not_follow_redirects_off_the_allowlist(server, cache):
+    # same server under another name, so a followed redirect would show up in hits
+    target = f"http://localhost:{server.server_port}/img"
+
+    with pytest.raises(ImageUnavailable, match="redirected off the allowed hosts"):
+        cache.thumbnail(f"{server.base}/to?url={target}")
+    assert server.hits == [f"/to?url={target}"]
+
+
+def test_gives_up_on_long_redirect_chains(server, cache):
+    with pytest.raises(ImageUnavailable, match="redirects"):
+        cache.thumbnail(f"{server.base}/r/{images.MAX_REDIRECTS + 1}")
+    assert len(server.hits) == images.MAX_REDIRECTS + 1
@@ -0,0 +1,135 @@
+"""
+Cursor pagination of GET /api/products against a small catalog that can be
+republished mid-walk
+"""
+import os
+
+import pandas as pd
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from catalog import Catalog, load_products
+from routes import products
+from routes.products import decode_cursor, encode_cursor
+
+ROWS = 53
+PER_PAGE = 10
+
+
+def write_catalog(path, rows=ROWS, offset=0):
+    pd.DataFrame({
+        "title": [f"Product {i:03d}" for i in range(rows)],
+        "brand": ["Samsung" if i % 3 else "Xiaomi" for i in range(rows)],
+        "type_product": ["smartphone"] * rows,
+        # duplicate prices so the sort has ties to break
+        "price_numeric": [100.0 + (i * 7 + offset) % 20 for i in range(rows)],
+        "old_price_numeric": [None] * rows,
+        "discount_percentage": [None] * rows,
+        "product_link": [f"https://www.jumia.ma/p-{i}.html" for i in range(rows)],
+        "image_url": [f"https://ma.jumia.is/unsafe/{i}.jpg" for i in range(rows)],
+        "category": ["telephone_tablette"] * rows,
+    }).to_csv(path, index=False)
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "products.csv"
+    write_catalog(path)
+    return path
+
+
+@pytest.fixture
+def client(csv_path, monkeypatch):
+    monkeypatch.setattr(products, "catalog", Catalog(csv_path, load=load_products))
+    app = FastAPI()
+    app.include_router(products.router)
+    return TestClient(app)
+
+
+def republish(path, **kwargs):
+    """Rewrite the dataset so the catalog sees a new version"""
+    st = path.stat()
+    write_catalog(path, **kwargs)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def walk(client, **params):
+    """Follow next_cursor to the end, returning every page"""
+    pages = [client.get("/api/products", params={"per_page": PER_PAGE, **params}).json()]
+    while pages[-1]["next_cursor"]:
+        r = client.get("/api/products", params={
+            "per_page": PER_PAGE, "cursor": pages[-1]["next_cursor"], **params,
+        })
+        assert r.status_code == 200, r.text
+        pages.append(r.json())
+    return pages
+
+
+def titles(pages):
+    return [p["title"] for page in pages for p in page["products"]]
+
+
+@pytest.mark.parametrize("sort", [
+    {},
+    {"sort_by": "price", "sort_order": "asc"},
+    {"sort_by": "price", "sort_order": "desc"},
+    {"sort_by": "title", "sort_order": "desc"},
+])
+def test_cursor_walk_matches_offset_pages(client, sort):
+    pages = walk(client, **sort)
+    offset = [
+        client.get("/api/products", params={"per_page": PER_PAGE, "page": n, **sort}).json()
+        for n in range(1, len(pages) + 1)
+    ]
+
+    assert len(pages) == -(-ROWS // PER_PAGE)
+    assert len(titles(pages)) == ROWS
+    assert len(set(titles(pages))) == ROWS
+    assert titles(pages) == titles(offset)
+
+
+def test_cursor_walk_with_filter(client):
+    pages = walk(client, brand="xiaomi", sort_by="price")
+
+    assert len(titles(pages)) == pages[0]["total"] == len(range(0, ROWS, 3))
+    assert {p["brand"] for page in pages for p in page["products"]} == {"Xiaomi"}
+
+
+def test_reload_mid_walk_is_gone_then_restarts(client, csv_path):
+    first = client.get("/api/products", params={"per_page": PER_PAGE, "sort_by": "price"}).json()
+    republish(csv_path, rows=ROWS + 4, offset=5)
+
+    r = client.get("/api/products", params={
+        "per_page": PER_PAGE, "sort_by": "price", "cursor": first["next_cursor"],
+    })
+    assert r.status_code == 410
+
+    pages = walk(client, sort_by="price")
+    assert pages[0]["version"] != first["version"]
+    assert len(set(titles(pages))) == ROWS + 4
+
+
+def test_cursor_from_another_query_is_rejected(client):
+    first = client.get("/api/products", params={"per_page": PER_PAGE, "sort_by": "price"}).json()
+
+    for params in ({"sort_by": "title"}, {"sort_by": "price", "brand": "samsung"}):
+        r = client.get("/api/products", params={"per_page": PER_PAGE, "cursor": first["next_cursor"], **params})
+        assert r.status_code == 400
+        assert r.json()["detail"] == "Cursor does not match the query"
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", encode_cursor({"v": "x"}), "bnVsbA", encode_cursor({"r": "abc"})])
+def test_malformed_cursor_is_rejected(client, cursor):
+    r = client.get("/api/products", params={"cursor": cursor})
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Invalid cursor"
+
+
+def test_decode_cursor_round_trip():
+    state = {"v": "1a-2b", "s": "price:asc", "f": "abc", "r": 41}
+    assert decode_cursor(encode_cursor(state)) == state
+
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("%%%")
+    assert exc.value.status_code == 400
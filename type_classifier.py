@@ -0,0 +1,105 @@
+"""
+Keyword-based product-type classifier.
+
+All rules from ``product_types.json`` are compiled into a single regex whose
+alternatives are factored into a character trie, so the engine walks each
+title once no matter how many types or keywords are configured.
+
+A title gets the type of its left-most keyword ("Télécommande pour TV" is a
+remote, "Smart TV + télécommande" a TV); series and brand *hints* such as
+"galaxy" or "redmi" are only used when no keyword matched.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+RULES_PATH = Path(__file__).with_name("product_types.json")
+
+KEYWORD, HINT = 0, 1
+
+
+def _key(text: str) -> str:
+    return "".join(text.lower().split())
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """Alternation of ``words`` factored by common prefix; longer words win."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        alts = [
+            (r"\s*" if ch == " " else re.escape(ch)) + emit(child)
+            for ch, child in sorted(node.items()) if ch
+        ]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+def load_rules(path: Path = RULES_PATH) -> List[dict]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))["rules"]
+
+
+class TypeClassifier:
+    def __init__(self, rules: List[dict]):
+        self._entries: Dict[str, Tuple[int, Optional[str]]] = {}
+        for rule in rules:
+            for tier, field in ((KEYWORD, "keywords"), (HINT, "hints")):
+                for word in rule.get(field, []):
+                    key = _key(word)
+                    entry = (tier, rule["type"])
+                    if self._entries.setdefault(key, entry) != entry:
+                        raise ValueError(f"Keyword {word!r} has conflicting type rules")
+
+        words = sorted({" ".join(w.lower().split()) for r in rules for f in ("keywords", "hints") for w in r.get(f, [])})
+        # optional plural, and no letter right after ("watch6" and "ps5" still match)
+        self.pattern = re.compile(rf"\b(?:{_trie_regex(words)})s?(?![^\W\d_])")
+
+    @classmethod
+    def from_file(cls, path: Path = RULES_PATH) -> "TypeClassifier":
+        return cls(load_rules(path))
+
+    def _lookup(self, match: str) -> Tuple[int, Optional[str]]:
+        key = _key(match)
+        if key not in self._entries and key.endswith("s"):
+            key = key[:-1]
+        return self._entries[key]
+
+    def classify(self, title: Optional[str]) -> Optional[str]:
+        if not title or not isinstance(title, str):
+            return None
+        hint = None
+        for m in self.pattern.finditer(title.lower()):
+            tier, type_ = self._lookup(m.group())
+            if tier == KEYWORD:
+                return type_
+            if hint is None:
+                hint = (type_,)
+        return hint[0] if hint else None
+
+    def classify_series(self, titles: pd.Series) -> pd.Series:
+        """:meth:`classify` over a whole title column, once per distinct title."""
+        codes, uniques = pd.factorize(titles)
+        types = np.array([*map(self.classify, uniques.tolist()), None], dtype=object)
+        return pd.Series(types[codes], index=titles.index)
+
+
+@lru_cache(maxsize=1)
+def default_classifier() -> TypeClassifier:
+    return TypeClassifier.from_file()